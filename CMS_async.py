@@ -0,0 +1,703 @@
+"""
+Asyncio serving mode for the CMS SOAP service.
+
+A Starlette application on the Motor driver, so a worker keeps many requests in flight
+while they wait on MongoDB. Its routes are built from the Flask app's URL map: every
+rule is served with the same path and methods by the async view registered under the
+rule's endpoint name, and requests no view takes get Flask's own 404/405 answers.
+Views return the Werkzeug responses of the CMS.py serializers, so parsing, validation
+and response documents are shared and only the database calls differ. Operations
+without an async implementation (the package store, bulk order import and the order
+summary) and the order event outbox and counters run their CMS.py code in a worker
+thread, on the pymongo client Motor wraps rather than a second connection pool.
+
+Requests are recorded in the CMS.py metrics. Motor runs commands on its own threads,
+outside the request's context, so they appear in cms_mongo_command_duration_seconds but
+not in the request's db phase; awaited database time is counted as serialize here.
+
+Needs starlette and motor. Run with:
+    uvicorn CMS_async:app --host 127.0.0.1 --port 8000
+"""
+import asyncio
+import contextlib
+import re
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.responses import Response as ASGIResponse, StreamingResponse
+from starlette.routing import Route
+from werkzeug.exceptions import HTTPException, InternalServerError, NotFound
+
+import CMS
+from CMS import Response, soap_error
+
+motor_client = None
+customers_collection = None
+orders_collection = None
+initialized = False
+initialize_lock = asyncio.Lock()
+
+def configure(customers, orders):
+    """Use the given async collections instead of connecting, e.g. a local stand-in"""
+    global customers_collection, orders_collection
+    customers_collection = customers
+    orders_collection = orders
+
+async def run_sync(function, *args):
+    """Run a CMS.py handler in a worker thread, including any streamed body it returns"""
+    def call():
+        response = function(*args)
+        if isinstance(response, Response):
+            response.get_data()
+        return response
+    return await asyncio.to_thread(call)
+
+def database_ready():
+    return orders_collection is not None
+
+async def get_customer_cached(customer_id, negative=True):
+    """CMS.customer_cache read-through on the async driver"""
+    customer = CMS.customer_cache.cached(customer_id, negative)
+    if customer is CMS._CACHE_MISS:
+        customer = await customers_collection.find_one({"customer_id": customer_id})
+        CMS.customer_cache.remember(customer_id, customer)
+    return customer
+
+async def customer_exists(customer_id):
+    return await get_customer_cached(customer_id) is not None
+
+def find_orders(query, **kwargs):
+    """CMS.find_orders on the async driver"""
+    cursor = orders_collection.find(query["filter"], query["projection"], **kwargs)
+    if query["sort"]:
+        cursor = cursor.sort(query["sort"])
+    if query["limit"]:
+        cursor = cursor.limit(query["limit"])
+    return cursor
+
+async def fetch_order_listing_validators(response_tag, customer_id, query):
+    """CMS.fetch_order_listing_validators on the async driver"""
+    summaries = await orders_collection.aggregate(CMS.order_listing_summary_pipeline(customer_id)).to_list(1)
+    return CMS.order_listing_validators(response_tag, customer_id, query, summaries[0] if summaries else None)
+
+async def fetch_order_listing_summary(response_tag, customer_id, query):
+    """CMS.fetch_order_listing_summary on the async driver"""
+    results = await orders_collection.aggregate(CMS.order_listing_summary_pipeline(customer_id, query)).to_list(1)
+    summary, orders_count = CMS.order_listing_summary(results[0] if results else None, query)
+    return CMS.order_listing_validators(response_tag, customer_id, query, summary), orders_count
+
+async def fetch_delivery_locations(order_ids):
+    """CMS.fetch_delivery_locations on the async driver"""
+    locations, missing = CMS.cached_delivery_locations(order_ids)
+    if missing:
+        async for order in orders_collection.aggregate(CMS.delivery_location_pipeline(missing)):
+            CMS.store_delivery_location(locations, order)
+    return locations
+
+async def record_order_events(events):
+    """CMS.record_order_events; the outbox is written with the sync client, in a worker thread"""
+    if events:
+        await asyncio.to_thread(CMS.record_order_events, events)
+
+async def apply_order_counts(increments):
+    """CMS.apply_order_counts, with the sync client in a worker thread like the order events"""
+    if increments:
+        await asyncio.to_thread(CMS.apply_order_counts, increments)
+
+async def wait_order_events(after, limit, customer_id=None, order_id=None, timeout=0):
+    """CMS.order_event_feed.wait without holding a thread while waiting"""
+    feed = CMS.order_event_feed
+    await asyncio.to_thread(feed.start)
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+
+    def listener():
+        loop.call_soon_threadsafe(changed.set)
+
+    feed.add_listener(listener)
+    try:
+        deadline = loop.time() + timeout
+        if after is None:
+            after = feed.horizon
+        while True:
+            changed.clear()
+            result = feed.read(after, limit, customer_id, order_id)
+            if result is None:
+                return await asyncio.to_thread(CMS.read_order_events, after, limit, customer_id, order_id)
+            events, after = result
+            remaining = deadline - loop.time()
+            if events or remaining <= 0:
+                return events, after
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        feed.remove_listener(listener)
+
+# Flask endpoint name -> async view(request, **path parameters); build_routes() serves
+# every Flask URL rule with the view of the same name
+ASYNC_VIEWS = {}
+
+def async_view(endpoint):
+    """Register the async view of a Flask endpoint declared in CMS.py"""
+    def register(view):
+        ASYNC_VIEWS[endpoint] = view
+        return view
+    return register
+
+ASYNC_SOAP_OPERATIONS = {}
+
+def async_soap_operation(name):
+    """Register the async implementation of a SOAP operation declared in CMS.py"""
+    def register(handler):
+        ASYNC_SOAP_OPERATIONS[name] = handler
+        return handler
+    return register
+
+async def dispatch_soap_request(service, data):
+    """CMS.dispatch_soap_request, preferring async implementations"""
+    operation, fields = CMS.parse_soap_request(data)
+    entry = CMS.SOAP_OPERATIONS.get(service, {}).get(operation)
+    if entry is None:
+        return Response("Method not found", status=400)
+    CMS.note_request_operation(operation)
+    argument = data if CMS.OPERATION_SCHEMAS.get(operation, {}).get("raw") else fields
+    handler = ASYNC_SOAP_OPERATIONS.get(operation)
+    if handler is None:
+        return await run_sync(entry["handler"], argument)
+    return await handler(argument)
+
+@async_soap_operation('create_customer')
+async def create_customer(fields):
+    customer_data, location_info, error = CMS.prepare_customer(fields)
+    if error:
+        return soap_error('create_customer_response', error)
+    if not database_ready():
+        return soap_error('create_customer_response', 'Database connection not available')
+
+    try:
+        result = await customers_collection.insert_one(customer_data)
+    except DuplicateKeyError:
+        return soap_error('create_customer_response', 'Customer already exists with this email or Firebase UID')
+    except Exception as e:
+        return soap_error('create_customer_response', str(e))
+    CMS.customer_cache.store(customer_data)
+    return CMS.customer_created_response(dict(customer_data, _id=str(result.inserted_id)), location_info)
+
+@async_soap_operation('get_customer')
+async def get_customer(fields):
+    customer_id = fields['customer_id']
+    if not customer_id:
+        return soap_error('get_customer_response', 'Customer ID is required')
+    if not database_ready():
+        return soap_error('get_customer_response', 'Database connection not available')
+
+    customer = await get_customer_cached(customer_id)
+    if not customer:
+        return soap_error('get_customer_response', 'Customer not found')
+    validators = CMS.customer_validators(customer)
+    return CMS.not_modified_response(validators) or CMS.with_validators(CMS.customer_response(customer), validators)
+
+@async_soap_operation('create_order')
+async def create_order(fields):
+    # The insert depends on the customer check, so these two calls stay sequential
+    order_data, error = CMS.build_order_document(fields)
+    if error:
+        return soap_error('create_order_response', error)
+    if not database_ready():
+        return soap_error('create_order_response', 'Database connection not available')
+
+    customer = await get_customer_cached(fields['customer_id'], negative=False)
+    if not customer:
+        return soap_error('create_order_response', 'Customer not found')
+    order_data['district'] = CMS.customer_district(customer)
+
+    try:
+        await orders_collection.insert_one(order_data)
+    except Exception as e:
+        return soap_error('create_order_response', f'Database error: {str(e)}')
+    await record_order_events([CMS.order_created_event(order_data)])
+    await apply_order_counts(CMS.created_order_counts([order_data]))
+    return CMS.order_created_response(fields['orderID'], fields['customer_id'], fields['totalAmount'])
+
+@async_soap_operation('get_customer_orders')
+async def get_customer_orders(fields):
+    customer_id = fields['customer_id']
+    if not customer_id:
+        return soap_error('get_customer_orders_response', 'Customer ID is required')
+    if not database_ready():
+        return soap_error('get_customer_orders_response', 'Database connection not available')
+
+    query, error = CMS.build_order_listing_query(
+        customer_id, CMS.ORDER_SUMMARY_FIELDS,
+        limit=fields['limit'], after=fields['after'], status=fields['status'], fields=fields['fields']
+    )
+    if error:
+        if not await customer_exists(customer_id):
+            return soap_error('get_customer_orders_response', 'Customer not found')
+        return soap_error('get_customer_orders_response', error)
+
+    # The customer check and the validators are independent, so both are in flight at once;
+    # the orders are read after the validators so the ETag is never newer than the body
+    exists, validators = await asyncio.gather(
+        customer_exists(customer_id),
+        fetch_order_listing_validators('get_customer_orders_response', customer_id, query)
+    )
+    if not exists:
+        return soap_error('get_customer_orders_response', 'Customer not found')
+    not_modified = CMS.not_modified_response(validators)
+    if not_modified:
+        return not_modified
+    orders = await find_orders(query).to_list(None)
+    return CMS.with_validators(CMS.customer_orders_response(customer_id, orders, query), validators)
+
+@async_soap_operation('get_order')
+async def get_order(fields):
+    order_id = fields['orderID']
+    if not order_id:
+        return soap_error('get_order_response', 'Order ID is required')
+    if not database_ready():
+        return soap_error('get_order_response', 'Database connection not available')
+
+    # A conditional refresh only needs updated_at to be answered
+    if CMS.is_conditional_request():
+        current = await orders_collection.find_one({"orderID": order_id}, CMS.ORDER_VALIDATOR_PROJECTION)
+        not_modified = CMS.not_modified_response(CMS.order_validators(current)) if current else None
+        if not_modified:
+            return not_modified
+
+    order = await orders_collection.find_one({"orderID": order_id})
+    if not order:
+        return soap_error('get_order_response', 'Order not found')
+    return CMS.with_validators(CMS.order_response(order), CMS.order_validators(order))
+
+async def find_nearby_customers(query):
+    """CMS.find_nearby_customers on the async driver"""
+    return await customers_collection.find(
+        CMS.nearby_customer_filter(query), CMS.NEARBY_CUSTOMER_PROJECTION
+    ).to_list(CMS.nearby_customer_limit(query))
+
+@async_soap_operation('find_nearby')
+async def find_nearby(fields):
+    query, error = CMS.parse_nearby_query(fields)
+    if error:
+        return soap_error('find_nearby_response', error)
+    if not database_ready():
+        return soap_error('find_nearby_response', 'Database connection not available')
+
+    try:
+        customers = await find_nearby_customers(query)
+        orders = None
+        if query["target"] == "orders" and customers:
+            orders = await orders_collection.find(
+                CMS.nearby_order_filter(query, customers), CMS.NEARBY_ORDER_PROJECTION
+            ).to_list(None)
+    except Exception as e:
+        CMS.logger.error("Error in find_nearby: %s", e)
+        return soap_error('find_nearby_response', f'Database error: {str(e)}')
+    return CMS.nearby_response(query, customers, orders)
+
+@async_soap_operation('plan_dispatch_batches')
+async def plan_dispatch(fields):
+    query, error = CMS.parse_dispatch_query(fields)
+    if error:
+        return soap_error('plan_dispatch_batches_response', error)
+    if not CMS.NUMPY_AVAILABLE:
+        return soap_error('plan_dispatch_batches_response', 'Dispatch batching requires the numpy package')
+    if not database_ready():
+        return soap_error('plan_dispatch_batches_response', 'Database connection not available')
+
+    orders = await CMS.find_dispatch_orders(orders_collection, query).to_list(None)
+    truncated = len(orders) > CMS.MAX_DISPATCH_ORDERS
+    del orders[CMS.MAX_DISPATCH_ORDERS:]
+    # The customer reads are independent, so all of them are in flight at once
+    chunks = await asyncio.gather(*(
+        customers_collection.find({"customer_id": {"$in": customer_ids}}, CMS.DISPATCH_CUSTOMER_PROJECTION).to_list(None)
+        for customer_ids in CMS.dispatch_customer_id_chunks(orders)
+    ))
+    locations = {}
+    for customers in chunks:
+        for customer in customers:
+            CMS.store_dispatch_location(locations, customer)
+    # Clustering and rendering are CPU-bound, so they run off the event loop
+    return await run_sync(CMS.dispatch_plan_response, query, orders, locations, truncated)
+
+@async_view('customer_soap_service')
+async def customer_soap_service(request):
+    try:
+        return await dispatch_soap_request('customerService', await request.body())
+    except Exception as e:
+        CMS.logger.error("Error in customer SOAP service: %s", e)
+        return soap_error('soap_error', f'Internal server error: {str(e)}', 500)
+
+@async_view('order_soap_service')
+async def order_soap_service(request):
+    try:
+        return await dispatch_soap_request('orderService', await request.body())
+    except Exception as e:
+        CMS.logger.error("Error in order SOAP service: %s", e)
+        return soap_error('soap_error', f'Internal server error: {str(e)}', 500)
+
+def wsdl_view(service):
+    async def wsdl(request):
+        if request.query_params.get('wsdl') is not None:
+            return Response(CMS.build_wsdl(service, str(request.url.replace(query=''))), content_type='text/xml')
+        return Response("SOAP Service")
+    return wsdl
+
+async_view('customer_wsdl')(wsdl_view('customerService'))
+async_view('order_wsdl')(wsdl_view('orderService'))
+
+def streaming_response(chunks, content_type, headers=None):
+    """A Starlette streaming response with exactly the Content-Type Flask sends for the same body"""
+    return StreamingResponse(chunks, headers=dict(headers or {}, **{"Content-Type": content_type}))
+
+async def stream_orders_response(response_tag, header, cursor, query):
+    """CMS.stream_orders_response over an async cursor"""
+    try:
+        yield CMS.orders_stream_head(response_tag, header)
+        returned_count = 0
+        last_order = None
+        writer = CMS.XMLWriter()
+        async for order in cursor:
+            returned_count += 1
+            last_order = order
+            CMS.render_order(writer, order, query["fields"])
+            yield writer.flush()
+        yield CMS.orders_stream_tail(response_tag, query, returned_count, last_order)
+    except Exception as e:
+        # Headers are already sent, so the only option left is to end the stream early
+        CMS.logger.error("Error while streaming %s: %s", response_tag, e)
+    finally:
+        await cursor.close()
+
+@async_view('get_all_orders_by_customer')
+async def get_all_orders_by_customer(request, customerID):
+    try:
+        if not customerID:
+            return soap_error('get_orders_response', 'Customer ID is required')
+        if not database_ready():
+            return soap_error('get_orders_response', 'Database connection not available')
+
+        query, error = CMS.build_order_listing_query(
+            customerID, CMS.ORDER_EXPORT_FIELDS,
+            limit=request.query_params.get('limit'), after=request.query_params.get('after'),
+            status=request.query_params.get('status'), fields=request.query_params.get('fields')
+        )
+        if error:
+            if not await customer_exists(customerID):
+                return soap_error('get_orders_response', 'Customer not found')
+            return soap_error('get_orders_response', error)
+
+        # The customer check and the validators are independent, so both are in flight at once;
+        # the orders are read after the validators so the ETag is never newer than the body
+        exists, (validators, orders_count) = await asyncio.gather(
+            customer_exists(customerID),
+            fetch_order_listing_summary('get_orders_response', customerID, query)
+        )
+        if not exists:
+            return soap_error('get_orders_response', 'Customer not found')
+        not_modified = CMS.not_modified_response(validators)
+        if not_modified:
+            return not_modified
+
+        CMS.logger.debug("Streaming %s orders for customer: %s", orders_count, customerID)
+
+        cursor = find_orders(query, batch_size=CMS.ORDERS_STREAM_BATCH_SIZE)
+        return streaming_response(stream_orders_response(
+            'get_orders_response', CMS.orders_listing_header(customerID, orders_count), cursor, query
+        ), 'text/xml', CMS.validator_headers(*validators))
+    except Exception as e:
+        CMS.logger.error("Error in get all orders endpoint: %s", e)
+        return soap_error('get_orders_response', f'Internal server error: {str(e)}', 500)
+
+@async_view('update_order_status')
+async def update_order_status(request):
+    try:
+        if not database_ready():
+            return soap_error('update_status_response', 'Database connection not available')
+
+        order_id, status_value, error = CMS.parse_status_update(await request.body())
+        if error:
+            return soap_error('update_status_response', error)
+
+        try:
+            previous = await orders_collection.find_one_and_update(
+                {"orderID": order_id},
+                {"$set": {"status": status_value, "updated_at": CMS.datetime.utcnow()}, "$inc": {"status_version": 1}},
+                projection=CMS.STATUS_CHANGE_PROJECTION
+            )
+        except Exception as e:
+            return soap_error('update_status_response', f'Database error: {str(e)}')
+
+        if previous is None:
+            return soap_error('update_status_response', 'Order not found')
+        await record_order_events(CMS.status_change_events({order_id: previous}, {order_id: status_value}))
+        await apply_order_counts(CMS.status_change_counts({order_id: previous}, {order_id: status_value}))
+        return CMS.status_updated_response(order_id, status_value)
+    except Exception as e:
+        CMS.logger.error("Error in update_status endpoint: %s", e)
+        return soap_error('update_status_response', f'Internal server error: {str(e)}', 500)
+
+@async_view('update_order_status_batch')
+async def update_order_status_batch(request):
+    try:
+        if not database_ready():
+            return soap_error('update_status_batch_response', 'Database connection not available')
+
+        results, latest, error = CMS.parse_status_batch(await request.body())
+        if error:
+            return soap_error('update_status_batch_response', error)
+
+        previous = {
+            order["orderID"]: order
+            async for order in orders_collection.find({"orderID": {"$in": list(latest)}}, CMS.STATUS_CHANGE_PROJECTION)
+        }
+
+        now = CMS.status_batch_timestamp()
+        operations = CMS.plan_status_batch(latest, {order_id: order.get("status") for order_id, order in previous.items()}, now)
+        if operations:
+            try:
+                written = await orders_collection.bulk_write(operations, ordered=False)
+                if written.modified_count < len(operations):
+                    CMS.resolve_status_batch(latest, {
+                        order["orderID"]: order
+                        async for order in orders_collection.find(
+                            {"orderID": {"$in": list(CMS.modified_statuses(latest))}}, CMS.STATUS_WRITE_PROJECTION
+                        )
+                    }, now)
+            except Exception as e:
+                return soap_error('update_status_batch_response', f'Database error: {str(e)}')
+            finally:
+                CMS.invalidate_status_batch(latest)
+            await record_order_events(CMS.status_batch_events(latest, previous))
+            await apply_order_counts(CMS.status_batch_counts(latest, previous))
+
+        return CMS.status_batch_response(results)
+    except Exception as e:
+        CMS.logger.error("Error in update_status_batch endpoint: %s", e)
+        return soap_error('update_status_batch_response', f'Internal server error: {str(e)}', 500)
+
+@async_view('get_delivery_location')
+async def get_delivery_location(request):
+    try:
+        if not database_ready():
+            return soap_error('get_delivery_location_response', 'Database connection not available')
+
+        try:
+            orderID = CMS.parse_soap_operation(await request.body(), None, CMS.OPERATION_SCHEMAS['get_delivery_location'])['orderID']
+        except CMS.ET.ParseError as e:
+            return soap_error('get_delivery_location_response', f'Invalid XML: {str(e)}')
+
+        if not orderID:
+            return soap_error('get_delivery_location_response', 'Order ID is required in payload')
+
+        return CMS.delivery_location_response((await fetch_delivery_locations([orderID])).get(orderID))
+    except Exception as e:
+        CMS.logger.error("Error in get_delivery_location endpoint: %s", e)
+        return soap_error('get_delivery_location_response', f'Internal server error: {str(e)}', 500)
+
+@async_view('get_delivery_locations')
+async def get_delivery_locations(request):
+    try:
+        if not database_ready():
+            return soap_error('get_delivery_locations_response', 'Database connection not available')
+
+        order_ids, error = CMS.parse_delivery_location_ids(await request.body())
+        if error:
+            return soap_error('get_delivery_locations_response', error)
+
+        locations = await fetch_delivery_locations(list(dict.fromkeys(order_id for order_id in order_ids if order_id)))
+        return CMS.delivery_locations_response(order_ids, locations)
+    except Exception as e:
+        CMS.logger.error("Error in get_delivery_locations endpoint: %s", e)
+        return soap_error('get_delivery_locations_response', f'Internal server error: {str(e)}', 500)
+
+@async_view('create_orders_stream')
+async def create_orders_stream(request):
+    """/api/createOrdersStream on the sync insert pipeline in a worker thread.
+    The body is read in full before parsing starts."""
+    data = await request.body()
+    mimetype = request.headers.get('content-type', '').split(';')[0].strip().lower()
+
+    def import_orders():
+        chunks = CMS.iter_chunks(data)
+        if mimetype in ('application/x-ndjson', 'application/jsonl', 'application/json'):
+            records = CMS.iter_ndjson_orders(chunks)
+        else:
+            records = (CMS.order_fields_from_element(elem)
+                       for elem in CMS.iter_xml_records(chunks, 'order', ('create_orders_batch',)))
+        results = CMS.insert_orders_batch(records)
+        return ''.join(CMS.stream_order_batch_response('create_orders_batch_response', results))
+
+    try:
+        if CMS.client is None:
+            return soap_error('create_orders_batch_response', 'Database connection not available')
+        return Response(await asyncio.to_thread(import_orders), content_type='text/xml')
+    except Exception as e:
+        CMS.logger.error("Error in create_orders_stream endpoint: %s", e)
+        return soap_error('create_orders_batch_response', f'Internal server error: {str(e)}', 500)
+
+@async_view('get_order_events')
+async def get_order_events(request):
+    try:
+        if CMS.order_events_collection is None:
+            return soap_error('order_events_response', 'Database connection not available')
+        query, error = CMS.parse_order_events_query(request.query_params)
+        if error:
+            return soap_error('order_events_response', error)
+        events, token = await wait_order_events(query["after"], query["limit"], query["customer_id"],
+                                                query["order_id"], query["timeout"])
+        return CMS.order_events_response(events, token)
+    except Exception as e:
+        CMS.logger.error("Error in order_events endpoint: %s", e)
+        return soap_error('order_events_response', f'Internal server error: {str(e)}', 500)
+
+@async_view('stream_order_events')
+async def stream_order_events(request):
+    if CMS.order_events_collection is None:
+        return soap_error('order_events_response', 'Database connection not available', 503)
+    query, error = CMS.parse_order_events_query(request.query_params, request.headers.get('last-event-id'))
+    if error:
+        return soap_error('order_events_response', error, 400)
+
+    async def generate():
+        yield f"retry: {CMS.ORDER_EVENTS_RETRY_MS}\n\n"
+        token, timeout = query["after"], 0
+        while True:
+            events, token = await wait_order_events(token, query["limit"], query["customer_id"], query["order_id"], timeout)
+            yield CMS.order_events_sse(events, token)
+            timeout = CMS.ORDER_EVENTS_HEARTBEAT
+
+    return streaming_response(generate(), 'text/event-stream', {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@async_view('cache_stats')
+async def cache_stats(request):
+    return CMS.cache_stats()
+
+@async_view('metrics')
+async def metrics(request):
+    return CMS.metrics()
+
+def routing_error_response(request):
+    """
+    Flask's answer to a request no async view takes, from the same URL map: Werkzeug's
+    404, 405 with its Allow header or redirect, or the automatic OPTIONS response
+    """
+    adapter = CMS.app.url_map.bind(request.url.hostname or 'localhost')
+    try:
+        adapter.match(request.url.path, request.method)
+    except HTTPException as e:
+        return e.get_response()
+    if request.method == 'OPTIONS':
+        response = Response()
+        response.allow.update(adapter.allowed_methods(request.url.path))
+        return response
+    return NotFound().get_response()
+
+async def counted_chunks(chunks, timing):
+    async for chunk in chunks:
+        timing.response_bytes += len(chunk.encode('utf-8'))
+        yield chunk
+
+def asgi_response(response, timing):
+    """
+    The Starlette response for a view's result, recording the request in the CMS.py
+    metrics once its body has been sent. Werkzeug responses keep their status and
+    headers; Starlette sets Content-Length from the body.
+    """
+    async def finish():
+        CMS.finish_request_timing(timing, response.status_code)
+
+    if isinstance(response, StreamingResponse):
+        response.body_iterator = counted_chunks(response.body_iterator, timing)
+        response.background = BackgroundTask(finish)
+        return response
+    body = response.get_data()
+    timing.response_bytes = len(body)
+    headers = {key: value for key, value in response.headers.items() if key.lower() != 'content-length'}
+    return ASGIResponse(body, status_code=response.status_code, headers=headers, background=BackgroundTask(finish))
+
+def asgi_endpoint(rule, view):
+    """Wrap an async view as the Starlette endpoint of a Flask URL rule"""
+    async def endpoint(request):
+        # Servers run without lifespan events initialize on the first request
+        if not initialized:
+            await initialize()
+        timing = CMS.start_request_timing(rule.rule, int(request.headers.get('content-length') or 0))
+        CMS.start_conditional_request(request.headers.get('if-none-match'), request.headers.get('if-modified-since'))
+        try:
+            response = await view(request, **request.path_params)
+        except Exception as e:
+            CMS.logger.error("Unhandled error on %s %s: %s", request.method, request.url.path, e)
+            response = InternalServerError().get_response()
+        return asgi_response(response, timing)
+    return endpoint
+
+async def routing_error(request, exc):
+    timing = CMS.start_request_timing("unmatched", int(request.headers.get('content-length') or 0))
+    return asgi_response(routing_error_response(request), timing)
+
+def build_routes():
+    """
+    One Starlette route per Flask URL rule, with the rule's path and methods, served by
+    the async view registered under the rule's endpoint name
+    """
+    routes = []
+    for rule in CMS.app.url_map.iter_rules():
+        if rule.endpoint == 'static':
+            continue
+        view = ASYNC_VIEWS.get(rule.endpoint)
+        if view is None:
+            raise RuntimeError(f"No async view for the Flask endpoint {rule.endpoint} ({rule.rule})")
+        path = re.sub(r'<(\w+)>', r'{\1}', rule.rule)
+        routes.append(Route(path, asgi_endpoint(rule, view), methods=sorted(rule.methods - {'OPTIONS'})))
+    return routes
+
+async def connect(config=None):
+    """
+    Open the Motor client with the CMS pool settings; must run inside the serving event loop.
+    CMS.py's sync code paths, run in worker threads, use the pymongo client Motor wraps,
+    so the process has a single connection pool.
+    """
+    global motor_client, customers_collection, orders_collection
+    config = config or CMS.SERVER_CONFIG
+    # Unlike the sync server this one does not start without a database: Motor would quietly use localhost
+    CMS.require_mongodb_uri(config)
+    motor_client = AsyncIOMotorClient(config["mongodb_uri"], **CMS.mongo_client_options(config))
+    db = motor_client[CMS.DB_NAME]
+    customers_collection = db[CMS.COLLECTION_NAME]
+    orders_collection = db[CMS.ORDERS_COLLECTION_NAME]
+    if CMS.client is None:
+        await asyncio.to_thread(CMS.use_mongo_client, motor_client.delegate)
+    CMS.logger.info("Connected to MongoDB (async) successfully!")
+
+async def initialize():
+    """Run CMS.create_app() without its sync client, then open the Motor client, once"""
+    global initialized
+    async with initialize_lock:
+        if initialized:
+            return
+        await asyncio.to_thread(CMS.create_app, None, False)
+        try:
+            if orders_collection is None:
+                await connect()
+        except Exception as e:
+            CMS.logger.error("Failed to connect to MongoDB: %s", e)
+        initialized = True
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    await initialize()
+    yield
+    if motor_client is not None:
+        motor_client.close()
+
+app = Starlette(
+    routes=build_routes(),
+    exception_handlers={404: routing_error, 405: routing_error},
+    lifespan=lifespan
+)
@@ -0,0 +1,97 @@
+"""
+Production launcher for the CMS SOAP service.
+
+Runs CMS.app on gunicorn's threaded workers with the settings from CMS.load_server_config():
+defaults, then the JSON file given by --config or $CMS_CONFIG, then CMS_<KEY> environment
+variables. The MongoDB URI is required (MONGODB_URI or CMS_MONGODB_URI); without it the
+launcher exits before starting any worker. The master preloads the app with
+CMS.create_app(connect=False), so district data is loaded once, but no MongoClient exists
+there: each worker creates its own after fork and warms min_pool_size connections before
+it takes traffic.
+
+    python CMS_server.py [--config server.json] [--print-config]
+
+Without gunicorn installed it falls back to a single-process threaded Werkzeug server.
+"""
+import json
+import sys
+
+import CMS
+
+def start_worker(config):
+    """Connect this process to MongoDB and warm its connection pool"""
+    CMS.connect_mongo(config)
+    warmed = CMS.warm_mongo_pool(config["min_pool_size"])
+    CMS.logger.info("Warmed %s MongoDB connections", warmed)
+
+def gunicorn_options(config):
+    return {
+        "bind": config["bind"],
+        "workers": config["workers"],
+        "threads": config["threads"],
+        "worker_class": "gthread",
+        "timeout": config["timeout"],
+        "preload_app": True,
+        "post_fork": lambda server, worker: start_worker(config)
+    }
+
+def run_gunicorn(config):
+    from gunicorn.app.base import BaseApplication
+
+    class CMSApplication(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(config).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Connections are opened per worker after fork, never in the master
+            return CMS.create_app(config, connect=False)
+
+    CMSApplication().run()
+
+def run_werkzeug(config):
+    from werkzeug.serving import run_simple
+
+    host, _, port = config["bind"].rpartition(':')
+    app = CMS.create_app(config, connect=False)
+    start_worker(config)
+    run_simple(host or '127.0.0.1', int(port), app, threaded=True)
+
+def main(argv):
+    path = argv[argv.index('--config') + 1] if '--config' in argv else None
+    try:
+        config = CMS.load_server_config(path)
+    except (OSError, ValueError) as e:
+        print(f"Invalid server configuration: {str(e)}")
+        return 1
+
+    if '--print-config' in argv:
+        print(json.dumps({key: value for key, value in config.items() if key != "mongodb_uri"}, indent=2))
+        return 0
+
+    # Fail before forking workers that could never reach the database
+    try:
+        CMS.require_mongodb_uri(config)
+    except ValueError as e:
+        print(f"Invalid server configuration: {str(e)}")
+        return 1
+
+    # The master builds the package store before forking, so every worker would keep
+    # a private copy of the statuses over one shared log file
+    if CMS.PACKAGE_STORE_BACKEND == "log" and config["workers"] > 1:
+        print("PACKAGE_STORE_BACKEND=log needs workers = 1; use the mongo backend for several workers")
+        return 1
+
+    print(f"CMS SOAP Server: {config['workers']} workers x {config['threads']} threads on {config['bind']}, "
+          f"Mongo pool {config['min_pool_size']}-{config['max_pool_size']} per worker, read preference {config['read_preference']}")
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print("gunicorn is not installed, serving from a single threaded process")
+        run_werkzeug(config)
+        return 0
+    run_gunicorn(config)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,244 @@
+"""Load test: the Flask app (sync, thread pool) vs CMS_async (asyncio, Motor API).
+
+Both modes run in-process against the same local Mongo stand-in: mongomock collections
+wrapped so that every round trip costs a fixed simulated network latency, as a
+time.sleep for the sync driver and an asyncio.sleep for the async one. Requests go
+straight to the WSGI / ASGI callables, so the numbers compare the serving models rather
+than an HTTP stack. Needs mongomock and motor.
+
+Once the CPU is saturated (CPU/req x req/s reaches the cores available) neither mode
+gains throughput, and requests in flight beyond that only wait: latency grows with
+in-flight count / throughput. The async mode pays off when round trips, not CPU, keep
+the sync threads busy, so each run is repeated for several round-trip latencies.
+
+Run from the repository root:
+    python benchmarks/bench_async_load.py [--requests N] [--latency-ms L ...] [--threads T] [--concurrency C]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import mongomock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import CMS
+import CMS_async
+
+
+class SyncStandIn:
+    """pymongo-style collection where every call first sleeps for the round-trip latency"""
+
+    def __init__(self, collection, latency):
+        self._collection = collection
+        self._latency = latency
+        self.name = collection.name
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        def call(*args, **kwargs):
+            time.sleep(self._latency)
+            return method(*args, **kwargs)
+        return call
+
+
+class AsyncStandInCursor:
+    """Motor-style cursor over a deferred mongomock query"""
+
+    def __init__(self, open_cursor, latency):
+        self._open_cursor = open_cursor
+        self._latency = latency
+        self._sort = None
+        self._limit = None
+
+    def sort(self, sort):
+        self._sort = sort
+        return self
+
+    def limit(self, limit):
+        self._limit = limit
+        return self
+
+    async def to_list(self, length):
+        await asyncio.sleep(self._latency)
+        cursor = self._open_cursor()
+        if self._sort:
+            cursor = cursor.sort(self._sort)
+        if self._limit:
+            cursor = cursor.limit(self._limit)
+        documents = list(cursor)
+        return documents if length is None else documents[:length]
+
+    async def __aiter__(self):
+        for document in await self.to_list(None):
+            yield document
+
+    async def close(self):
+        pass
+
+
+class AsyncStandIn:
+    """Motor-style collection where every round trip awaits the simulated latency"""
+
+    def __init__(self, collection, latency):
+        self._collection = collection
+        self._latency = latency
+        self.name = collection.name
+
+    def find(self, *args, **kwargs):
+        kwargs.pop('batch_size', None)
+        return AsyncStandInCursor(lambda: self._collection.find(*args, **kwargs), self._latency)
+
+    def aggregate(self, pipeline):
+        return AsyncStandInCursor(lambda: self._collection.aggregate(pipeline), self._latency)
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(self._latency)
+            return method(*args, **kwargs)
+        return call
+
+
+def build_database(customer_count=50, orders_per_customer=4):
+    db = mongomock.MongoClient()[CMS.DB_NAME]
+    CMS.ensure_indexes(db)
+    now = datetime.utcnow()
+    db[CMS.COLLECTION_NAME].insert_many([{
+        "customer_id": f"C{c}", "firebaseUID": f"uid-{c}", "email": f"c{c}@example.com",
+        "name": f"Customer {c}", "phone": "0770000000", "role": "customer",
+        "current_location": {"address": "Colombo", "latitude": 6.93, "longitude": 79.85}
+    } for c in range(customer_count)])
+    db[CMS.ORDERS_COLLECTION_NAME].insert_many([{
+        "orderID": f"O{c}-{o}", "customer_id": f"C{c}", "totalAmount": 100.0 + o, "priority": "medium",
+        "status": "pending", "created_at": now, "updated_at": now,
+        "items": [{"product_id": "P1", "name": "Parcel", "quantity": 1, "price": 100.0, "image": ""}]
+    } for c in range(customer_count) for o in range(orders_per_customer)])
+    return db
+
+
+def workload(count, customer_count=50, orders_per_customer=4):
+    """A mix of order reads, listings, delivery lookups and status updates"""
+    requests = []
+    for i in range(count):
+        customer = f"C{(i * 7) % customer_count}"
+        order = f"O{(i * 7) % customer_count}-{i % orders_per_customer}"
+        kind = i % 4
+        if kind == 0:
+            requests.append(('/orderService', f'<get_order><orderID>{order}</orderID></get_order>'))
+        elif kind == 1:
+            requests.append(('/orderService', f'<get_customer_orders><customer_id>{customer}</customer_id><limit>5</limit></get_customer_orders>'))
+        elif kind == 2:
+            requests.append(('/getDeliveryLocation', f'<get_delivery_location><orderID>{order}</orderID></get_delivery_location>'))
+        else:
+            requests.append(('/api/updateStatus', f'<update_order_status><orderID>{order}</orderID><status>s{i}</status></update_order_status>'))
+    return requests
+
+
+def reset_caches():
+    CMS.customer_cache.clear()
+    CMS.delivery_location_cache.clear()
+
+
+def run_sync(db, requests, latency, threads):
+    CMS.client = object()
+    CMS.customers_collection = SyncStandIn(db[CMS.COLLECTION_NAME], latency)
+    CMS.orders_collection = SyncStandIn(db[CMS.ORDERS_COLLECTION_NAME], latency)
+    reset_caches()
+
+    def call(request):
+        client = CMS.app.test_client()
+        start = time.perf_counter()
+        response = client.post(request[0], data=request[1])
+        assert response.status_code == 200, response.data
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(call, requests))
+    return time.perf_counter() - start, latencies
+
+
+async def run_async(db, requests, latency, concurrency):
+    CMS_async.configure(AsyncStandIn(db[CMS.COLLECTION_NAME], latency), AsyncStandIn(db[CMS.ORDERS_COLLECTION_NAME], latency))
+    reset_caches()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(request):
+        async with semaphore:
+            scope = {"type": "http", "method": "POST", "path": request[0], "query_string": b"", "headers": []}
+            sent = []
+            messages = [{"type": "http.request", "body": request[1].encode('utf-8'), "more_body": False}]
+
+            async def receive():
+                # As an ASGI server does, block after the body until the client disconnects
+                if messages:
+                    return messages.pop()
+                await asyncio.Future()
+
+            async def send(message):
+                sent.append(message)
+
+            start = time.perf_counter()
+            await CMS_async.app(scope, receive, send)
+            assert sent[0]["status"] == 200, sent
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(call(request) for request in requests))
+    return time.perf_counter() - start, latencies
+
+
+def report(label, elapsed, cpu, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:>22} {len(latencies) / elapsed:>10.0f} {statistics.median(latencies) * 1000:>9.1f} "
+          f"{p99 * 1000:>9.1f} {cpu / len(latencies) * 1000:>12.2f}")
+
+
+def measured(run):
+    """run() plus the process CPU time it used, to show when a mode is CPU-bound"""
+    cpu = time.process_time()
+    elapsed, latencies = run()
+    return elapsed, time.process_time() - cpu, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--latency-ms', type=float, nargs='+', default=[2.0, 20.0, 50.0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=64)
+    args = parser.parse_args()
+
+    requests = workload(args.requests)
+    print(f"{args.requests} requests; async runs with as many requests in flight as the sync threads, then with more")
+    print(f"{'mode':>22} {'req/s':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'CPU/req (ms)':>12}")
+    for latency_ms in args.latency_ms:
+        latency = latency_ms / 1000
+        print(f"{latency_ms} ms simulated Mongo round trip")
+        # Handlers log every request; keep that out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = [
+                (f"sync ({args.threads} threads)",
+                 measured(lambda: run_sync(build_database(), requests, latency, args.threads))),
+                (f"async ({args.threads} in flight)",
+                 measured(lambda: asyncio.run(run_async(build_database(), requests, latency, args.threads)))),
+                (f"async ({args.concurrency} in flight)",
+                 measured(lambda: asyncio.run(run_async(build_database(), requests, latency, args.concurrency)))),
+            ]
+        for label, result in results:
+            report(label, *result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark: plan_dispatch_batches on a large pending backlog, vs a pure-Python planner.
+
+Synthetic customers are scattered around the district centres (a few outside the
+service area, some with no location) and given pending orders of mixed priority.
+Planning is timed separately from rendering the SOAP response; MongoDB reads are
+not included, since they depend on the server. The results are checked: every
+order is batched once or reported unassigned, batches respect the size cap, and
+districts agree with CMS.nearest_district.
+
+Run from the repository root:
+    python benchmarks/bench_dispatch_batches.py [--orders N] [--customers N] [--max-batch-size N]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import CMS
+
+PRIORITIES = ("urgent", "high", "medium", "medium", "medium", "low")
+
+
+def generate_backlog(order_count, customer_count, seed=42):
+    rng = random.Random(seed)
+    centres = [(district["latitude"], district["longitude"]) for district in CMS.DISTRICT_COORDINATES.values()]
+    locations = {}
+    for number in range(customer_count):
+        roll = rng.random()
+        if roll < 0.02:
+            continue  # no stored location
+        if roll < 0.03:
+            locations[f"C{number}"] = (rng.uniform(-10, 0), rng.uniform(60, 70))  # outside the service area
+            continue
+        latitude, longitude = rng.choice(centres)
+        locations[f"C{number}"] = (rng.gauss(latitude, 0.15), rng.gauss(longitude, 0.15))
+    orders = [{
+        "orderID": f"O{number}",
+        "customer_id": f"C{rng.randrange(customer_count)}",
+        "priority": rng.choice(PRIORITIES),
+        "totalAmount": round(rng.uniform(5, 500), 2)
+    } for number in range(order_count)]
+    return orders, locations
+
+
+def plan_python(orders, locations, max_batch_size):
+    """The same plan with per-order Python loops: nearest centre, bearing sort, equal cuts"""
+    centres = {name: (math.radians(data["latitude"]), math.radians(data["longitude"]))
+               for name, data in CMS.DISTRICT_COORDINATES.items()}
+    groups = {}
+    for order in orders:
+        location = locations.get(order["customer_id"])
+        if location is None:
+            continue
+        latitude, longitude = map(math.radians, location)
+        best, best_distance = None, None
+        for name, (centre_latitude, centre_longitude) in centres.items():
+            h = (math.sin((centre_latitude - latitude) / 2) ** 2
+                 + math.cos(latitude) * math.cos(centre_latitude) * math.sin((centre_longitude - longitude) / 2) ** 2)
+            distance = 2 * CMS.EARTH_RADIUS_KM * math.asin(math.sqrt(min(h, 1.0)))
+            if best_distance is None or distance < best_distance:
+                best, best_distance = name, distance
+        if best_distance > CMS.NEAREST_DISTRICT_MAX_KM:
+            continue
+        centre_latitude, centre_longitude = centres[best]
+        bearing = math.atan2((longitude - centre_longitude) * math.cos(centre_latitude), latitude - centre_latitude)
+        groups.setdefault((best, order.get("priority") or "medium"), []).append((bearing, order))
+    batches = []
+    for members in groups.values():
+        members.sort(key=lambda member: member[0])
+        parts = -(-len(members) // max_batch_size)
+        cuts = [len(members) * part // parts for part in range(parts + 1)]
+        batches.extend(members[cuts[part]:cuts[part + 1]] for part in range(parts))
+    return batches
+
+
+def check_plan(orders, locations, batches, unassigned, max_batch_size, sample=2000):
+    seen = [order["orderID"] for batch in batches for order in batch["orders"]]
+    seen += [order["orderID"] for order, _ in unassigned]
+    assert sorted(seen) == sorted(order["orderID"] for order in orders), "orders lost or duplicated"
+    assert all(len(batch["orders"]) <= max_batch_size for batch in batches), "batch over the size cap"
+    rng = random.Random(1)
+    for batch in rng.sample(batches, min(len(batches), sample)):
+        order = rng.choice(batch["orders"])
+        assert CMS.nearest_district(*locations[order["customer_id"]])[0] == batch["district"], "district mismatch"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=100_000)
+    parser.add_argument('--customers', type=int, default=30_000)
+    parser.add_argument('--max-batch-size', type=int, default=CMS.DISPATCH_BATCH_SIZE)
+    args = parser.parse_args()
+
+    CMS.load_district_coordinates()
+    orders, locations = generate_backlog(args.orders, args.customers)
+
+    start = time.perf_counter()
+    batches, unassigned = CMS.plan_dispatch_batches(orders, locations, args.max_batch_size)
+    planned = time.perf_counter()
+    body = CMS.dispatch_batches_response(batches, unassigned, locations, False).get_data()
+    rendered = time.perf_counter()
+    check_plan(orders, locations, batches, unassigned, args.max_batch_size)
+
+    python_start = time.perf_counter()
+    python_batches = plan_python(orders, locations, args.max_batch_size)
+    python_seconds = time.perf_counter() - python_start
+
+    print(f"Orders:            {args.orders} ({len(unassigned)} unassigned) from {args.customers} customers")
+    print(f"Batches:           {len(batches)} of at most {args.max_batch_size} "
+          f"(pure Python plan: {len(python_batches)})")
+    print(f"NumPy plan:        {planned - start:.3f}s")
+    print(f"Render response:   {rendered - planned:.3f}s ({len(body) / 1e6:.1f} MB)")
+    print(f"Pure Python plan:  {python_seconds:.3f}s")
+    print(f"Planning speedup:  {python_seconds / (planned - start):.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Micro-benchmark: compiled district matcher vs the original linear scan.
+
+Run from the repository root:
+    python benchmarks/bench_district_matcher.py [address_count]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import CMS
+
+STREETS = ["Galle Road", "Temple Lane", "Station Road", "Main Street", "Lake Drive",
+           "Hospital Road", "Park Avenue", "Church Street", "Market Road", "Hill Street"]
+FILLERS = ["Apartment", "Building", "Junction", "Near the post office", "Opposite school"]
+
+
+def detect_district_linear(address):
+    """The original implementation: nested substring scan in dict order"""
+    if not address:
+        return None
+    address_lower = address.lower().strip()
+    for district_name, district_data in CMS.DISTRICT_COORDINATES.items():
+        if district_name.lower() in address_lower:
+            return {"district": district_name, "match_type": "district_name", "matched_text": district_name}
+        for alias in district_data["aliases"]:
+            if alias in address_lower:
+                return {"district": district_name, "match_type": "alias", "matched_text": alias}
+    return None
+
+
+def is_whole_word(text, address):
+    return re.search(rf"(?<!\w){re.escape(text.lower())}(?!\w)", address.lower()) is not None
+
+
+def generate_addresses(count, seed=42):
+    """Synthetic addresses: mostly a district name or alias, some with no district at all"""
+    rng = random.Random(seed)
+    tokens = []
+    for district_name, district_data in CMS.DISTRICT_COORDINATES.items():
+        tokens.append(district_name)
+        tokens.extend(alias.title() for alias in district_data["aliases"])
+    addresses = []
+    for _ in range(count):
+        parts = [f"No {rng.randint(1, 500)}", rng.choice(STREETS)]
+        if rng.random() < 0.5:
+            parts.append(rng.choice(FILLERS))
+        if rng.random() < 0.9:
+            parts.append(rng.choice(tokens))
+        addresses.append(", ".join(parts))
+    return addresses
+
+
+def time_detector(detector, addresses):
+    start = time.perf_counter()
+    for address in addresses:
+        detector(address)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    # Importing CMS no longer loads district data; create_app() or this call does
+    CMS.load_district_coordinates()
+    addresses = generate_addresses(count)
+
+    linear_seconds = time_detector(detect_district_linear, addresses)
+    compiled_seconds = time_detector(CMS.detect_district_from_address, addresses)
+
+    same_district = 0
+    inside_words = 0
+    for address in addresses:
+        linear = detect_district_linear(address) or {}
+        compiled = CMS.detect_district_from_address(address) or {}
+        if linear.get("district") == compiled.get("district"):
+            same_district += 1
+        elif not is_whole_word(linear["matched_text"], address):
+            # e.g. the Nuwara Eliya alias "ne" inside "Lane" or "Near"
+            inside_words += 1
+
+    print(f"Addresses:        {count}")
+    print(f"Linear scan:      {linear_seconds:.3f}s ({count / linear_seconds:,.0f} addr/s)")
+    print(f"Compiled matcher: {compiled_seconds:.3f}s ({count / compiled_seconds:,.0f} addr/s)")
+    print(f"Speedup:          {linear_seconds / compiled_seconds:.2f}x")
+    print(f"Same district:    {same_district / count:.1%}")
+    print(f"  linear matched inside another word: {inside_words / count:.1%}")
+    print(f"  longest-match precedence:           {(count - same_district - inside_words) / count:.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,413 @@
+"""Benchmark and load generator for every SOAP endpoint of CMS.py.
+
+Builds realistic SOAP envelopes for each operation, seeds customers, orders and packages
+through the service's own API, then drives every scenario and reports throughput,
+p50/p95/p99 latency and memory allocated per request. Results are written as JSON so
+two commits can be compared with --compare.
+
+Modes:
+    client  requests go through the Flask test client, in this process (default)
+    http    requests go over HTTP to an in-process threaded Werkzeug server, or to a
+            running server given with --url (which brings its own database)
+
+The in-process database is mongomock (--mongo mongomock, the default) or a real
+server (--mongo mongodb://localhost:27017), using the --database name, which is dropped
+afterwards. Allocations are measured with tracemalloc in client mode only, on a separate
+single-threaded pass, so they do not skew the timings: alloc_kib is the median peak of
+memory allocated while serving one request, retained_blocks the memory blocks still
+held per request afterwards (caches, leaks).
+
+Run from the repository root:
+    python benchmarks/bench_endpoints.py [--mode client|http] [--requests N] [--concurrency C]
+        [--customers S] [--orders-per-customer K] [--items N] [--scenarios a,b,...]
+        [--output results.json] [--compare baseline.json] [--tolerance PERCENT]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import CMS
+
+SOAP_ENVELOPE = ('<?xml version="1.0" encoding="utf-8"?>'
+                 '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" '
+                 'xmlns:cms="http://swiftlogistics.lk/cms"><soap:Body>{}</soap:Body></soap:Envelope>')
+ADDRESSES = ("No. 12, Temple Road, Kandy", "45/2 Galle Road, Colombo 03", "Main Street, Negombo",
+             "8 Lake Drive, Kurunegala", "Station Road, Jaffna", "Beach Road, Matara")
+STATUSES = ("processing", "packed", "shipped", "out_for_delivery", "delivered")
+BATCH_SIZE = 10
+
+
+def envelope(operation, fields='', items=''):
+    """A SOAP request for an operation; fields are (name, value) pairs"""
+    body = ''.join(f'<{name}>{CMS.xml_text(value)}</{name}>' for name, value in fields)
+    return SOAP_ENVELOPE.format(f'<{operation}>{body}{items}</{operation}>')
+
+
+def order_items(order_number, count):
+    return ''.join(
+        f'<item><product_id>P-{order_number}-{i}</product_id><name>Product {i} &amp; accessories</name>'
+        f'<quantity>{i % 3 + 1}</quantity><price>{499.5 + i}</price>'
+        f'<image>https://cdn.example.com/p/{order_number}/{i}.png</image></item>'
+        for i in range(count)
+    )
+
+
+def order_record(order_id, customer_id, order_number, item_count):
+    """One NDJSON line for /api/createOrdersStream"""
+    return json.dumps({
+        "orderID": order_id, "customer_id": customer_id, "totalAmount": 1000 + order_number,
+        "priority": ("low", "medium", "high")[order_number % 3],
+        "items": [{"product_id": f"P-{order_number}-{i}", "name": f"Product {i}", "quantity": i % 3 + 1,
+                   "price": 499.5 + i, "image": f"https://cdn.example.com/p/{order_number}/{i}.png"}
+                  for i in range(item_count)]
+    })
+
+
+class ClientTransport:
+    """Requests through the Flask test client; one client per worker thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, content_type='text/xml'):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = CMS.app.test_client()
+        response = client.open(path, method=method, data=body, content_type=content_type, buffered=True)
+        return response.status_code, response.get_data()
+
+
+class HTTPTransport:
+    """Requests over HTTP, one connection per request"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+
+    def request(self, method, path, body=None, content_type='text/xml'):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            headers = {"Content-Type": content_type} if body is not None else {}
+            connection.request(method, path, body=body.encode('utf-8') if isinstance(body, str) else body,
+                               headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+
+def use_database(args):
+    """Point CMS at mongomock or a real server and initialize it. Returns a cleanup callable."""
+    if args.mongo == 'mongomock':
+        import mongomock
+        CMS.client = mongomock.MongoClient()
+        CMS.db = CMS.client[args.database]
+        CMS.customers_collection = CMS.db[CMS.COLLECTION_NAME]
+        CMS.orders_collection = CMS.db[CMS.ORDERS_COLLECTION_NAME]
+        CMS.packages_collection = CMS.db[CMS.PACKAGES_COLLECTION_NAME]
+        CMS.ensure_indexes(CMS.db)
+        CMS.create_app(connect=False)
+        return lambda: None
+
+    CMS.DB_NAME = args.database
+    CMS.create_app(dict(CMS.load_server_config(), mongodb_uri=args.mongo))
+    if CMS.client is None:
+        raise SystemExit(f"Could not connect to {args.mongo}")
+    return lambda: CMS.client.drop_database(args.database)
+
+
+def start_http_server():
+    """Serve CMS.app from a threaded Werkzeug server on a free port. Returns (base URL, server)."""
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, CMS.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+class Dataset:
+    """IDs created by seed(), shared by the scenarios"""
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.customer_ids = []
+        self.order_ids = []
+        self.package_ids = []
+
+
+def check(status, body, what):
+    if status != 200 or b'<status>Error</status>' in body:
+        raise SystemExit(f"Seeding failed on {what}: HTTP {status} {body[:300]!r}")
+
+
+def seed(transport, args):
+    """Create --customers customers with K orders each, and packages, through the API"""
+    data = Dataset(uuid.uuid4().hex[:8])
+    for c in range(args.customers):
+        firebase_uid = f"bench-{data.run_id}-{c}"
+        status, body = transport.request('POST', '/customerService', envelope('create_customer', (
+            ('firebaseUID', firebase_uid), ('name', f"Customer {c}"), ('email', f"{firebase_uid}@example.com"),
+            ('phone', f"07{c:08d}"), ('address', ADDRESSES[c % len(ADDRESSES)]))))
+        check(status, body, 'create_customer')
+        data.customer_ids.append(re.search(rb'<customer_id>(.*?)</customer_id>', body).group(1).decode())
+
+    records = []
+    for c, customer_id in enumerate(data.customer_ids):
+        for o in range(args.orders_per_customer):
+            order_id = f"ORD-{data.run_id}-{c}-{o}"
+            records.append(order_record(order_id, customer_id, c * args.orders_per_customer + o, args.items))
+            data.order_ids.append(order_id)
+    status, body = transport.request('POST', '/api/createOrdersStream', '\n'.join(records) + '\n',
+                                     'application/x-ndjson')
+    check(status, body, 'createOrdersStream')
+
+    for _ in range(args.packages):
+        status, body = transport.request('POST', '/orderService', envelope('new_package'))
+        check(status, body, 'new_package')
+        data.package_ids.append(re.search(rb'<new_package_response>(.*?)</new_package_response>', body).group(1).decode())
+    return data
+
+
+def pick(values, i):
+    return values[(i * 7919) % len(values)]
+
+
+def status_batch(data, i):
+    updates = ''.join(
+        f'<update_order_status><orderID>{pick(data.order_ids, i * BATCH_SIZE + j)}</orderID>'
+        f'<status>{STATUSES[(i + j) % len(STATUSES)]}</status></update_order_status>'
+        for j in range(BATCH_SIZE))
+    return SOAP_ENVELOPE.format(f'<update_order_status_batch>{updates}</update_order_status_batch>')
+
+
+def package_batch(data, i):
+    packages = ''.join(
+        f'<package><package_id>{pick(data.package_ids, i * BATCH_SIZE + j)}</package_id>'
+        f'<status_code>{STATUSES[(i + j) % len(STATUSES)]}</status_code></package>'
+        for j in range(BATCH_SIZE))
+    return SOAP_ENVELOPE.format(f'<update_packages>{packages}</update_packages>')
+
+
+# Scenario name -> request builder (dataset, args, i) -> (method, path, body, content type)
+SCENARIOS = {
+    "create_customer": lambda data, args, i: ('POST', '/customerService', envelope('create_customer', (
+        ('firebaseUID', f"new-{data.run_id}-{i}"), ('name', f"New Customer {i}"),
+        ('email', f"new-{data.run_id}-{i}@example.com"), ('phone', f"071{i:07d}"),
+        ('address', ADDRESSES[i % len(ADDRESSES)]))), 'text/xml'),
+    "get_customer": lambda data, args, i: ('POST', '/customerService', envelope('get_customer', (
+        ('customer_id', pick(data.customer_ids, i)),)), 'text/xml'),
+    "create_order": lambda data, args, i: ('POST', '/orderService', envelope('create_order', (
+        ('orderID', f"NEW-{data.run_id}-{i}"), ('customer_id', pick(data.customer_ids, i)),
+        ('totalAmount', 1500 + i), ('priority', 'high')),
+        f'<items>{order_items(i, args.items)}</items>'), 'text/xml'),
+    "get_customer_orders": lambda data, args, i: ('POST', '/orderService', envelope('get_customer_orders', (
+        ('customer_id', pick(data.customer_ids, i)),)), 'text/xml'),
+    "get_orders_stream": lambda data, args, i: ('GET', f"/getOrders/{pick(data.customer_ids, i)}", None, 'text/xml'),
+    "get_order": lambda data, args, i: ('POST', '/orderService', envelope('get_order', (
+        ('orderID', pick(data.order_ids, i)),)), 'text/xml'),
+    "update_status": lambda data, args, i: ('POST', '/api/updateStatus', envelope('update_order_status', (
+        ('orderID', pick(data.order_ids, i)), ('status', STATUSES[i % len(STATUSES)]))), 'text/xml'),
+    "update_status_batch": lambda data, args, i: ('POST', '/api/updateStatusBatch', status_batch(data, i), 'text/xml'),
+    "get_delivery_location": lambda data, args, i: ('POST', '/getDeliveryLocation', envelope('get_delivery_location', (
+        ('orderID', pick(data.order_ids, i)),)), 'text/xml'),
+    "get_delivery_locations": lambda data, args, i: ('POST', '/getDeliveryLocations', envelope('get_delivery_locations', tuple(
+        ('orderID', pick(data.order_ids, i * BATCH_SIZE + j)) for j in range(BATCH_SIZE))), 'text/xml'),
+    "new_package": lambda data, args, i: ('POST', '/orderService', envelope('new_package'), 'text/xml'),
+    "update_package": lambda data, args, i: ('POST', '/orderService', envelope('update_package', (
+        ('package_id', pick(data.package_ids, i)), ('status_code', STATUSES[i % len(STATUSES)]))), 'text/xml'),
+    "get_package_status": lambda data, args, i: ('POST', '/orderService', envelope('get_package_status', (
+        ('package_id', pick(data.package_ids, i)),)), 'text/xml'),
+    "update_packages": lambda data, args, i: ('POST', '/orderService', package_batch(data, i), 'text/xml'),
+}
+
+
+def is_error(status, body):
+    return status != 200 or b'<status>Error</status>' in body
+
+
+def run_scenario(transport, requests, concurrency):
+    """Send the requests from concurrency threads. Returns (elapsed seconds, latencies, error count)."""
+    def call(request):
+        start = time.perf_counter()
+        status, body = transport.request(*request)
+        return time.perf_counter() - start, is_error(status, body)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, requests))
+    elapsed = time.perf_counter() - start
+    return elapsed, [latency for latency, _ in results], sum(error for _, error in results)
+
+
+def measure_allocations(transport, requests):
+    """Median peak KiB allocated while serving one request, and blocks retained per request"""
+    peaks = []
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    for request in requests:
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        transport.request(*request)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    retained = (sys.getallocatedblocks() - blocks_before) / len(requests)
+    tracemalloc.stop()
+    return statistics.median(peaks) / 1024, retained
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(elapsed, latencies, errors):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, tolerance):
+    """Print changes against a baseline results file. Returns the names of regressed scenarios."""
+    with open(baseline_path, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"\nAgainst {baseline_path} (commit {baseline.get('commit')}), tolerance {tolerance:.0f}%")
+    if (baseline.get("mode"), baseline.get("target"), baseline.get("parameters")) != \
+            (results["mode"], results["target"], results["parameters"]):
+        print("Warning: the baseline was run with a different mode, target or parameters")
+    print(f"{'scenario':>24} {'req/s':>9} {'p95':>9}")
+    regressed = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        throughput = (current["throughput_rps"] / previous["throughput_rps"] - 1) * 100
+        p95 = (current["p95_ms"] / previous["p95_ms"] - 1) * 100 if previous["p95_ms"] else 0.0
+        flag = ""
+        if throughput < -tolerance or p95 > tolerance:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:>24} {throughput:>+8.1f}% {p95:>+8.1f}%{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=('client', 'http'), default='client')
+    parser.add_argument('--url', help="http mode: an already running server instead of an in-process one")
+    parser.add_argument('--mongo', default='mongomock', help="mongomock or a MongoDB URI")
+    parser.add_argument('--database', default='CMS_bench')
+    parser.add_argument('--requests', type=int, default=500, help="per scenario")
+    parser.add_argument('--warmup', type=int, default=20, help="untimed requests per scenario")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--customers', type=int, default=50)
+    parser.add_argument('--orders-per-customer', type=int, default=10)
+    parser.add_argument('--items', type=int, default=3, help="items per created order")
+    parser.add_argument('--packages', type=int, default=200)
+    parser.add_argument('--scenarios', help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument('--allocation-samples', type=int, default=100)
+    parser.add_argument('--output', help="results JSON (default benchmarks/results/endpoints-<commit>-<mode>.json)")
+    parser.add_argument('--compare', help="baseline results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args()
+
+    names = args.scenarios.split(',') if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    cleanup = lambda: None
+    server = None
+    if args.url:
+        if args.mode != 'http':
+            parser.error("--url needs --mode http")
+        transport = HTTPTransport(args.url)
+    else:
+        cleanup = use_database(args)
+        if args.mode == 'http':
+            base_url, server = start_http_server()
+            transport = HTTPTransport(base_url)
+        else:
+            transport = ClientTransport()
+
+    try:
+        data = seed(transport, args)
+        print(f"{args.mode} mode, {args.mongo if not args.url else args.url}: {len(data.customer_ids)} customers x "
+              f"{args.orders_per_customer} orders, {args.items} items per created order, "
+              f"{args.requests} requests per scenario, concurrency {args.concurrency}")
+        print(f"{'scenario':>24} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'alloc KiB':>10} {'errors':>7}")
+        scenarios = {}
+        offset = 0
+        for name in names:
+            build = SCENARIOS[name]
+            # Requests are numbered across scenarios so creates never reuse an ID
+            requests = [build(data, args, offset + i) for i in range(args.warmup + args.requests)]
+            offset += len(requests)
+            run_scenario(transport, requests[:args.warmup], args.concurrency)
+            result = summarize(*run_scenario(transport, requests[args.warmup:], args.concurrency))
+            if args.mode == 'client' and args.allocation_samples:
+                samples = [build(data, args, offset + i) for i in range(args.allocation_samples)]
+                offset += len(samples)
+                result["alloc_kib"], result["retained_blocks"] = measure_allocations(transport, samples)
+            scenarios[name] = result
+            alloc = f"{result['alloc_kib']:.1f}" if "alloc_kib" in result else "-"
+            print(f"{name:>24} {result['throughput_rps']:>9.0f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                  f"{result['p99_ms']:>8.2f} {alloc:>10} {result['errors']:>7}")
+    finally:
+        if server is not None:
+            server.shutdown()
+        cleanup()
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mode": args.mode,
+        "target": args.url or args.mongo,
+        "parameters": {key: getattr(args, key) for key in (
+            'requests', 'warmup', 'concurrency', 'customers', 'orders_per_customer', 'items', 'packages')},
+        "scenarios": scenarios
+    }
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"endpoints-{commit or 'unknown'}-{args.mode}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Micro-benchmark: nearest-district reverse geocoding, k-d tree vs a linear scan.
+
+A dispatch cycle reverse-geocodes every stop, so this times batches of random points
+over the districts' bounding box (plus a margin) and checks both methods agree.
+
+Run from the repository root:
+    python benchmarks/bench_nearest_district.py [point_count]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import CMS
+
+
+def nearest_district_linear(latitude, longitude):
+    """Haversine distance to every district centre"""
+    best, best_distance = None, None
+    for district_name, district_data in CMS.DISTRICT_COORDINATES.items():
+        distance = CMS.great_circle_km(latitude, longitude, district_data["latitude"], district_data["longitude"])
+        if best_distance is None or distance < best_distance:
+            best, best_distance = district_name, distance
+    if best_distance is None or best_distance > CMS.NEAREST_DISTRICT_MAX_KM:
+        return None, None
+    return best, best_distance
+
+
+def generate_points(count, seed=42):
+    rng = random.Random(seed)
+    latitudes = [district["latitude"] for district in CMS.DISTRICT_COORDINATES.values()]
+    longitudes = [district["longitude"] for district in CMS.DISTRICT_COORDINATES.values()]
+    return [(rng.uniform(min(latitudes) - 0.5, max(latitudes) + 0.5),
+             rng.uniform(min(longitudes) - 0.5, max(longitudes) + 0.5)) for _ in range(count)]
+
+
+def time_lookup(lookup, points):
+    start = time.perf_counter()
+    for latitude, longitude in points:
+        lookup(latitude, longitude)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    CMS.load_district_coordinates()
+    points = generate_points(count)
+
+    linear_seconds = time_lookup(nearest_district_linear, points)
+    kdtree_seconds = time_lookup(CMS.nearest_district, points)
+    same_district = sum(
+        1 for latitude, longitude in points
+        if nearest_district_linear(latitude, longitude)[0] == CMS.nearest_district(latitude, longitude)[0]
+    )
+
+    print(f"Districts:     {len(CMS.DISTRICT_COORDINATES)}")
+    print(f"Points:        {count}")
+    print(f"Linear scan:   {linear_seconds:.3f}s ({count / linear_seconds:,.0f} points/s)")
+    print(f"k-d tree:      {kdtree_seconds:.3f}s ({count / kdtree_seconds:,.0f} points/s)")
+    print(f"Speedup:       {linear_seconds / kdtree_seconds:.2f}x")
+    print(f"Same district: {same_district / count:.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark: XMLWriter order listings vs the original f-string concatenation.
+
+Run from the repository root:
+    python benchmarks/bench_order_serialization.py [order_count ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import CMS
+
+
+def build_orders(count, items_per_order=3):
+    now = datetime.utcnow()
+    return [{
+        "_id": f"{i:024x}",
+        "orderID": f"ORD-{i:07d}",
+        "customer_id": "customer-1",
+        "totalAmount": 1250.5 + i,
+        "priority": "high" if i % 5 == 0 else "medium",
+        "status": "pending",
+        "created_at": now,
+        "updated_at": now,
+        "items": [{
+            "product_id": f"P-{i}-{j}",
+            "name": f"Product {j} & accessories",
+            "quantity": j + 1,
+            "price": 99.99,
+            "image": f"https://cdn.example.com/products/{i}/{j}.png"
+        } for j in range(items_per_order)]
+    } for i in range(count)]
+
+
+def legacy_get_orders(customer_id, orders):
+    """The original /getOrders/<customerID> body construction"""
+    orders_xml = ""
+    for order in orders:
+        items_xml = ""
+        if order.get('items'):
+            for item in order['items']:
+                items_xml += f'''<item>
+                        <product_id>{item.get('product_id', '')}</product_id>
+                        <name>{item.get('name', '')}</name>
+                        <quantity>{item.get('quantity', 0)}</quantity>
+                        <price>{item.get('price', 0)}</price>
+                        <image>{item.get('image', '')}</image>
+                    </item>'''
+
+        created_at = order.get('created_at', '')
+        updated_at = order.get('updated_at', '')
+        if isinstance(created_at, datetime):
+            created_at = created_at.isoformat()
+        if isinstance(updated_at, datetime):
+            updated_at = updated_at.isoformat()
+
+        orders_xml += f'''<order>
+                <_id>{str(order.get('_id', ''))}</_id>
+                <orderID>{order.get('orderID', '')}</orderID>
+                <customer_id>{order.get('customer_id', '')}</customer_id>
+                <totalAmount>{order.get('totalAmount', 0)}</totalAmount>
+                <priority>{order.get('priority', '')}</priority>
+                <status>{order.get('status', 'pending')}</status>
+                <created_at>{created_at}</created_at>
+                <updated_at>{updated_at}</updated_at>
+                <items>{items_xml}</items>
+            </order>'''
+
+    response_body = f'''<get_orders_response>
+            <status>Success</status>
+            <customer_id>{customer_id}</customer_id>
+            <orders_count>{len(orders)}</orders_count>
+            <orders>
+                {orders_xml}
+            </orders>
+        </get_orders_response>'''
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        {response_body}
+    </soap:Body>
+</soap:Envelope>"""
+
+
+def writer_get_orders(customer_id, orders):
+    writer = CMS.XMLWriter()
+    writer.start('get_orders_response')
+    writer.elements((('status', 'Success'), ('customer_id', customer_id), ('orders_count', len(orders))))
+    writer.start('orders')
+    for order in orders:
+        CMS.render_order(writer, order, CMS.ORDER_EXPORT_FIELDS)
+    writer.end('orders')
+    writer.end('get_orders_response')
+    return CMS.create_soap_response(writer)
+
+
+def measure(builder, orders, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = builder("customer-1", orders)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    builder("customer-1", orders)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(output.encode('utf-8'))
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000]
+    print(f"{'orders':>8} {'builder':>8} {'time (ms)':>10} {'peak alloc (KB)':>16} {'size (KB)':>10}")
+    for count in counts:
+        orders = build_orders(count)
+        for label, builder in (("f-string", legacy_get_orders), ("writer", writer_get_orders)):
+            seconds, peak, size = measure(builder, orders)
+            print(f"{count:>8} {label:>8} {seconds * 1000:>10.1f} {peak / 1024:>16.0f} {size / 1024:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
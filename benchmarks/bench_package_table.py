@@ -0,0 +1,77 @@
+"""Benchmark: memory and lookup cost of CompactPackageStore vs the original package dict.
+
+Each store is filled in a fresh subprocess, and the resident set growth is reported.
+Every package is created as "Awaiting Packing" the way new_package does it. Half of them
+are then updated with status strings built per request, as parsed SOAP text would be.
+
+Run from the repository root:
+    python benchmarks/bench_package_table.py [package_count ...]
+"""
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STATUSES = ("Packed", "Shipped", "Out for Delivery", "Delivered")
+
+
+def resident_bytes():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def package_id(i):
+    return str(uuid.UUID(int=(i * 0x9E3779B97F4A7C15) & ((1 << 128) - 1), version=4))
+
+
+def fill(kind, count):
+    import CMS
+
+    # IDs are generated inside the fill loop so each store owns its keys, as it would in the server
+    baseline = resident_bytes()
+    if kind == "dict":
+        store = {}
+        for i in range(count):
+            store[package_id(i)] = "Awaiting Packing"
+        for i in range(0, count, 2):
+            store[package_id(i)] = "".join(STATUSES[i % 4])
+    else:
+        store = CMS.CompactPackageStore()
+        for i in range(count):
+            store.create(package_id(i), "Awaiting Packing")
+        for i in range(0, count, 2):
+            store.update(package_id(i), "".join(STATUSES[i % 4]))
+    used = resident_bytes() - baseline
+
+    lookups = [package_id(i) for i in range(0, count, max(1, count // 100000))]
+    get = store.get
+    start = time.perf_counter()
+    for lookup_id in lookups:
+        get(lookup_id)
+    lookup_ns = (time.perf_counter() - start) / len(lookups) * 1e9
+
+    print(f"{used} {lookup_ns}")
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        fill(sys.argv[2], int(sys.argv[3]))
+        return
+
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000000, 10000000]
+    print(f"{'packages':>10} {'store':>8} {'memory (MB)':>12} {'bytes/pkg':>10} {'get (ns)':>9}")
+    for count in counts:
+        for kind in ("dict", "compact"):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', kind, str(count)],
+                capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            used, lookup_ns = (float(value) for value in output.split())
+            print(f"{count:>10} {kind:>8} {used / 2 ** 20:>12.0f} {used / count:>10.1f} {lookup_ns:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
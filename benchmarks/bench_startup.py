@@ -0,0 +1,67 @@
+"""Benchmark: import-to-first-request latency of CMS.py, with and without the district cache.
+
+Every sample is a fresh interpreter that imports CMS, runs create_app(connect=False) and
+serves one new_package request through the test client. "cold" starts with no district
+cache (the XML is parsed and the cache written), "warm" reuses the cache the previous
+run left. MongoDB is not contacted: connection time depends on the network, not on
+this process.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import time
+start = time.perf_counter()
+import CMS
+imported = time.perf_counter()
+CMS.create_app(connect=False)
+initialized = time.perf_counter()
+response = CMS.app.test_client().post('/orderService', data='<new_package/>')
+assert response.status_code == 200, response.data
+served = time.perf_counter()
+print(imported - start, initialized - imported, served - initialized, served - start)
+'''
+
+
+def sample(cache_path):
+    env = dict(os.environ, DISTRICT_CACHE_PATH=cache_path)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    process = time.perf_counter() - start
+    return [float(value) for value in output.strip().splitlines()[-1].split()] + [process]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    results = {"cold": [], "warm": []}
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, 'district_coordinates.cache')
+        for _ in range(args.runs):
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            results["cold"].append(sample(cache_path))
+            results["warm"].append(sample(cache_path))
+
+    print(f"{args.runs} runs each, median milliseconds")
+    print(f"{'cache':>6} {'import':>8} {'init':>8} {'request':>8} {'total':>8} {'process':>8}")
+    for label, samples in results.items():
+        medians = [statistics.median(column) * 1000 for column in zip(*samples)]
+        print(f"{label:>6} " + " ".join(f"{value:>8.1f}" for value in medians))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Shared fixtures: the CMS app wired to an in-memory mongomock database.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+mongomock = pytest.importorskip("mongomock")
+
+import CMS
+
+SOAP_ENVELOPE = ('<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+                 '<soap:Body>{}</soap:Body></soap:Envelope>')
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """A fresh mongomock database behind every CMS collection global"""
+    mongo = mongomock.MongoClient()
+    db = mongo[CMS.DB_NAME]
+    CMS.ensure_indexes(db)
+    monkeypatch.setattr(CMS, "client", mongo)
+    monkeypatch.setattr(CMS, "db", db)
+    for name, collection in (
+        ("customers_collection", CMS.COLLECTION_NAME),
+        ("orders_collection", CMS.ORDERS_COLLECTION_NAME),
+        ("packages_collection", CMS.PACKAGES_COLLECTION_NAME),
+        ("order_events_collection", CMS.ORDER_EVENTS_COLLECTION_NAME),
+        ("counters_collection", CMS.COUNTERS_COLLECTION_NAME),
+        ("order_counters_collection", CMS.ORDER_COUNTERS_COLLECTION_NAME),
+    ):
+        monkeypatch.setattr(CMS, name, db[collection])
+    CMS.create_app(connect=False)
+    CMS.customer_cache.clear()
+    CMS.delivery_location_cache.clear()
+    CMS.district_resolution_cache.clear()
+    return db
+
+
+@pytest.fixture
+def client(database):
+    return CMS.app.test_client()
+
+
+@pytest.fixture
+def soap(client):
+    """POST a SOAP body to a service and return the response"""
+    def post(path, body, **kwargs):
+        return client.post(path, data=SOAP_ENVELOPE.format(body), content_type='text/xml', **kwargs)
+    return post
+
+
+@pytest.fixture
+def create_customer(soap):
+    def create(customer_id, latitude=None, longitude=None):
+        location = ''
+        if latitude is not None:
+            location = f'<latitude>{latitude}</latitude><longitude>{longitude}</longitude>'
+        response = soap('/customerService', (
+            f'<create_customer><firebaseUID>{customer_id}</firebaseUID><name>{customer_id}</name>'
+            f'<email>{customer_id}@example.com</email><phone>0771234567</phone>{location}</create_customer>'
+        ))
+        assert b'<status>Success</status>' in response.data, response.data
+        return customer_id
+    return create
+
+
+@pytest.fixture
+def create_order(soap):
+    def create(order_id, customer_id, total_amount=10, priority='medium'):
+        response = soap('/orderService', (
+            f'<create_order><orderID>{order_id}</orderID><customer_id>{customer_id}</customer_id>'
+            f'<totalAmount>{total_amount}</totalAmount><priority>{priority}</priority></create_order>'
+        ))
+        assert b'<status>Success</status>' in response.data, response.data
+        return order_id
+    return create
@@ -0,0 +1,171 @@
+"""CMS_async serves the same routes and response documents as the Flask app."""
+import asyncio
+import re
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("motor")
+pytest.importorskip("starlette")
+
+import mongomock
+
+import CMS
+import CMS_async
+
+from conftest import SOAP_ENVELOPE
+
+
+class AsyncCursor:
+    """Motor-style cursor over a mongomock query"""
+
+    def __init__(self, open_cursor):
+        self._open_cursor = open_cursor
+        self._sort = None
+        self._limit = None
+
+    def sort(self, sort):
+        self._sort = sort
+        return self
+
+    def limit(self, limit):
+        self._limit = limit
+        return self
+
+    async def to_list(self, length):
+        cursor = self._open_cursor()
+        if self._sort:
+            cursor = cursor.sort(self._sort)
+        if self._limit:
+            cursor = cursor.limit(self._limit)
+        documents = list(cursor)
+        return documents if length is None else documents[:length]
+
+    async def __aiter__(self):
+        for document in await self.to_list(None):
+            yield document
+
+    async def close(self):
+        pass
+
+
+class AsyncCollection:
+    """Motor-style collection over a mongomock one"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        kwargs.pop('batch_size', None)
+        return AsyncCursor(lambda: self._collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline):
+        return AsyncCursor(lambda: self._collection.aggregate(pipeline))
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+def seeded_database(monkeypatch):
+    database = mongomock.MongoClient()[CMS.DB_NAME]
+    CMS.ensure_indexes(database)
+    monkeypatch.setattr(CMS, "client", database.client)
+    for name, collection in (
+        ("customers_collection", CMS.COLLECTION_NAME),
+        ("orders_collection", CMS.ORDERS_COLLECTION_NAME),
+        ("order_events_collection", CMS.ORDER_EVENTS_COLLECTION_NAME),
+        ("counters_collection", CMS.COUNTERS_COLLECTION_NAME),
+        ("order_counters_collection", CMS.ORDER_COUNTERS_COLLECTION_NAME),
+    ):
+        monkeypatch.setattr(CMS, name, database[collection])
+    database[CMS.COLLECTION_NAME].insert_one({
+        "customer_id": "C1", "firebaseUID": "C1", "email": "c1@example.com", "name": "Ann", "phone": "0771234567",
+        "role": "customer", "current_location": {"address": "Colombo", "latitude": 6.93, "longitude": 79.85}
+    })
+    created = datetime(2024, 1, 1)
+    database[CMS.ORDERS_COLLECTION_NAME].insert_many([{
+        "orderID": f"O{i}", "customer_id": "C1", "totalAmount": 5.0 + i, "priority": "high", "status": "pending",
+        "created_at": created, "updated_at": created, "items": [{"product_id": "P1", "name": "Tea & cake"}]
+    } for i in range(3)])
+    CMS.customer_cache.clear()
+    CMS.delivery_location_cache.clear()
+    return database
+
+
+def normalized(status, headers, body):
+    headers = sorted((key.lower(), value) for key, value in headers
+                     if key.lower() not in ("content-length", "etag", "last-modified"))
+    body = re.sub(r'<_id>\w+</_id>', '<_id>ID</_id>', re.sub(r'\d{4}-\d\d-\d\dT[\d:.]+', 'TIME', body))
+    return status, headers, re.sub(r'<next_cursor>[^<]+', '<next_cursor>CURSOR', body)
+
+
+def flask_response(method, path, body):
+    response = CMS.app.test_client().open(path, method=method, data=body)
+    return normalized(response.status_code, response.headers.items(), response.get_data(as_text=True))
+
+
+async def asgi_response(method, path, body):
+    path, _, query = path.partition('?')
+    scope = {"type": "http", "method": method, "path": path, "query_string": query.encode(),
+             "headers": [(b"host", b"localhost")]}
+    messages = [{"type": "http.request", "body": body.encode(), "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Future()
+
+    async def send(message):
+        sent.append(message)
+
+    await CMS_async.app(scope, receive, send)
+    headers = [(key.decode(), value.decode()) for key, value in sent[0]["headers"]]
+    return normalized(sent[0]["status"], headers, b"".join(message.get("body", b"") for message in sent[1:]).decode())
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ('POST', '/customerService', SOAP_ENVELOPE.format('<get_customer><customer_id>C1</customer_id></get_customer>')),
+    ('POST', '/customerService', SOAP_ENVELOPE.format('<get_customer><customer_id>C9</customer_id></get_customer>')),
+    ('POST', '/customerService', SOAP_ENVELOPE.format('<unknown_operation/>')),
+    ('POST', '/orderService', SOAP_ENVELOPE.format(
+        '<create_order><orderID>N1</orderID><customer_id>C1</customer_id><totalAmount>12.5</totalAmount></create_order>')),
+    ('POST', '/orderService', SOAP_ENVELOPE.format('<get_order><orderID>O1</orderID></get_order>')),
+    ('POST', '/orderService', SOAP_ENVELOPE.format(
+        '<get_customer_orders><customer_id>C1</customer_id><limit>2</limit></get_customer_orders>')),
+    ('POST', '/orderService', SOAP_ENVELOPE.format('<get_package_status><package_id>x</package_id></get_package_status>')),
+    ('POST', '/api/updateStatus', '<update_order_status><orderID>O1</orderID><status>shipped</status></update_order_status>'),
+    ('POST', '/getDeliveryLocations', '<get_delivery_locations><orderID>O1</orderID><orderID>O9</orderID></get_delivery_locations>'),
+    ('GET', '/getOrders/C1?limit=2', ''),
+    ('GET', '/getOrders/C9', ''),
+    ('GET', '/orderService?wsdl', ''),
+    ('GET', '/orderService', ''),
+    ('GET', '/nowhere', ''),
+    ('DELETE', '/orderService', ''),
+    ('GET', '/api/updateStatus', ''),
+    ('OPTIONS', '/getOrders/C1', ''),
+])
+def test_async_app_answers_like_the_flask_app(monkeypatch, method, path, body):
+    CMS.create_app(connect=False)
+    seeded_database(monkeypatch)
+    expected = flask_response(method, path, body)
+
+    database = seeded_database(monkeypatch)
+    monkeypatch.setattr(CMS_async, "initialized", True)
+    CMS_async.configure(AsyncCollection(database[CMS.COLLECTION_NAME]), AsyncCollection(database[CMS.ORDERS_COLLECTION_NAME]))
+    try:
+        assert asyncio.run(asgi_response(method, path, body)) == expected
+    finally:
+        CMS_async.configure(None, None)
+
+
+def test_every_flask_rule_has_an_async_route():
+    flask_rules = {(rule.rule.replace('<customerID>', '{customerID}'), method)
+                   for rule in CMS.app.url_map.iter_rules() if rule.endpoint != 'static'
+                   for method in rule.methods - {'OPTIONS'}}
+    async_routes = {(route.path, method) for route in CMS_async.app.routes for method in route.methods}
+    assert async_routes == flask_rules
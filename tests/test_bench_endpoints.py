@@ -0,0 +1,72 @@
+"""Smoke runs of benchmarks/bench_endpoints.py: every scenario succeeds, results round-trip through --compare."""
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_PATH = os.path.join(REPO_ROOT, 'benchmarks', 'bench_endpoints.py')
+SMALL_RUN = ['--requests', '6', '--warmup', '1', '--customers', '2', '--orders-per-customer', '2',
+             '--packages', '4', '--allocation-samples', '2', '--concurrency', '2']
+
+
+def load_bench():
+    spec = importlib.util.spec_from_file_location('bench_endpoints', BENCH_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_bench(*args):
+    return subprocess.run([sys.executable, BENCH_PATH, *SMALL_RUN, *args], cwd=REPO_ROOT,
+                          capture_output=True, text=True, timeout=120)
+
+
+@pytest.mark.parametrize("mode", ["client", "http"])
+def test_every_scenario_runs_without_errors(tmp_path, mode):
+    output = tmp_path / "results.json"
+    finished = run_bench('--mode', mode, '--output', str(output))
+    assert finished.returncode == 0, finished.stderr
+
+    results = json.loads(output.read_text())
+    assert (results["mode"], results["target"], results["parameters"]["requests"]) == (mode, "mongomock", 6)
+    assert list(results["scenarios"]) == list(load_bench().SCENARIOS)
+    for name, scenario in results["scenarios"].items():
+        assert (name, scenario["requests"], scenario["errors"]) == (name, 6, 0)
+        assert scenario["p50_ms"] <= scenario["p95_ms"] <= scenario["p99_ms"]
+        assert ("alloc_kib" in scenario) == (mode == "client")
+
+
+def test_slower_run_fails_the_comparison(tmp_path):
+    baseline_path = tmp_path / "baseline.json"
+    finished = run_bench('--scenarios', 'get_customer,get_order', '--output', str(baseline_path))
+    assert finished.returncode == 0, finished.stderr
+
+    # Far apart enough that timing noise of a six-request run cannot flip either verdict
+    baseline = json.loads(baseline_path.read_text())
+    baseline["scenarios"]["get_customer"].update(throughput_rps=0.001, p95_ms=1e6)
+    baseline["scenarios"]["get_order"].update(throughput_rps=1e9, p95_ms=1e-6)
+    baseline_path.write_text(json.dumps(baseline))
+    compared = run_bench('--scenarios', 'get_customer,get_order', '--output', str(tmp_path / "current.json"),
+                         '--compare', str(baseline_path))
+    assert compared.returncode == 1
+    regressions = [line.split()[0] for line in compared.stdout.splitlines() if line.endswith("REGRESSION")]
+    assert regressions == ["get_order"]
+
+
+def test_compare_skips_scenarios_missing_from_the_baseline(tmp_path, capsys):
+    bench = load_bench()
+    scenario = {"throughput_rps": 100.0, "p95_ms": 2.0}
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text(json.dumps({"mode": "client", "target": "mongomock", "parameters": {},
+                                         "scenarios": {"get_order": dict(scenario, p95_ms=1.0)}}))
+    results = {"mode": "http", "target": "mongomock", "parameters": {},
+               "scenarios": {"get_order": scenario, "new_package": scenario}}
+
+    assert bench.compare(results, str(baseline_path), 10.0) == ["get_order"]
+    printed = capsys.readouterr().out
+    assert "different mode, target or parameters" in printed and "new_package" not in printed
+    assert "+100.0%  REGRESSION" in printed
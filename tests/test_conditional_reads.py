@@ -0,0 +1,93 @@
+"""ETag / Last-Modified on order reads, with the service clock under the test's control."""
+from datetime import datetime
+
+import pytest
+
+import CMS
+
+
+class Clock(datetime):
+    """Stand-in for CMS.datetime whose utcnow() is set by the test"""
+    current = datetime(2024, 5, 1, 12, 0, 0, 200000)
+
+    @classmethod
+    def utcnow(cls):
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(CMS, "datetime", Clock)
+    monkeypatch.setattr(Clock, "current", Clock.current)
+
+    def set_time(second, microsecond=0):
+        Clock.current = datetime(2024, 5, 1, 12, 0, second, microsecond)
+    return set_time
+
+
+@pytest.fixture
+def order(clock, create_customer, create_order):
+    clock(0, 200000)
+    create_customer("C1")
+    return create_order("O1", "C1")
+
+
+def get_order(soap, **headers):
+    return soap('/orderService', '<get_order><orderID>O1</orderID></get_order>', headers=headers)
+
+
+def set_status(client, status):
+    client.post('/api/updateStatus', data=f'<update_order_status><orderID>O1</orderID><status>{status}</status></update_order_status>')
+
+
+def test_last_modified_is_withheld_until_its_second_is_over(soap, clock, order):
+    clock(0, 700000)
+    response = get_order(soap)
+    assert response.headers["ETag"] and "Last-Modified" not in response.headers
+    assert get_order(soap, **{"If-Modified-Since": "Wed, 01 May 2024 12:00:00 GMT"}).status_code == 200
+
+    clock(1)
+    assert get_order(soap).headers["Last-Modified"] == "Wed, 01 May 2024 12:00:00 GMT"
+
+
+def test_change_in_the_same_second_is_not_hidden_by_if_modified_since(client, soap, clock, order):
+    clock(0, 600000)
+    set_status(client, "shipped")
+    clock(0, 900000)
+    assert get_order(soap, **{"If-Modified-Since": "Wed, 01 May 2024 12:00:00 GMT"}).status_code == 200
+
+    clock(5)
+    since = get_order(soap).headers["Last-Modified"]
+    assert get_order(soap, **{"If-Modified-Since": since}).status_code == 304
+
+    clock(5, 100000)
+    set_status(client, "delivered")
+    clock(5, 300000)
+    assert get_order(soap, **{"If-Modified-Since": since}).status_code == 200
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since(client, soap, clock, order):
+    clock(3)
+    first = get_order(soap)
+    etag, since = first.headers["ETag"], first.headers["Last-Modified"]
+    clock(3, 500000)
+    set_status(client, "shipped")
+
+    clock(9)
+    # A date that would still match cannot save a stale tag...
+    assert get_order(soap, **{"If-None-Match": etag, "If-Modified-Since": "Wed, 01 May 2024 12:00:09 GMT"}).status_code == 200
+    # ...and a current tag wins over a date that no longer matches
+    current = get_order(soap).headers["ETag"]
+    assert get_order(soap, **{"If-None-Match": current, "If-Modified-Since": since}).status_code == 304
+
+
+def test_status_change_with_a_repeated_timestamp_changes_the_etags(client, soap, clock, order):
+    # Another worker whose clock lags writes the same updated_at the order already has
+    clock(0, 200000)
+    order_etag = get_order(soap).headers["ETag"]
+    listing_etag = client.get('/getOrders/C1').headers["ETag"]
+    set_status(client, "shipped")
+
+    response = get_order(soap, **{"If-None-Match": order_etag})
+    assert response.status_code == 200 and b'<status>shipped</status>' in response.data
+    assert client.get('/getOrders/C1', headers={"If-None-Match": listing_etag}).status_code == 200
@@ -0,0 +1,119 @@
+"""CustomerCache: read-through hits, the negative cache and its bypass, expiry, and the shared backend."""
+import time
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import CMS
+
+
+class Clock:
+    """CMS.time with a monotonic clock the test advances"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(CMS, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def customers(database):
+    return database[CMS.COLLECTION_NAME]
+
+
+def add_customer(customers, customer_id):
+    customers.insert_one(CMS.new_customer_document(customer_id, customer_id, f"{customer_id}@example.com", "0771234567"))
+
+
+def memory_cache():
+    return CMS.CustomerCache(CMS.TTLCache(100, CMS.CUSTOMER_CACHE_TTL))
+
+
+def test_unknown_customer_is_remembered_until_created(soap, database, create_customer):
+    cache = CMS.customer_cache
+    assert cache.get("C1") is None
+    assert cache.get("C1") is None
+    assert (cache.database_reads, cache.stats()["negative_hits"]) == (1, 1)
+
+    # create_customer writes through and clears the negative entry
+    create_customer("C1")
+    assert cache.get("C1")["name"] == "C1"
+    assert cache.database_reads == 1
+
+
+def test_negative_false_looks_past_a_recent_miss(customers, clock):
+    cache = memory_cache()
+    assert cache.get("C2") is None
+    add_customer(customers, "C2")  # a signup handled by another worker
+
+    assert cache.get("C2") is None
+    assert cache.get("C2", negative=False)["customer_id"] == "C2"
+    assert cache.get("C2")["customer_id"] == "C2"
+    assert cache.database_reads == 2
+
+
+def test_entries_expire_after_their_ttl(customers, clock):
+    cache = memory_cache()
+    add_customer(customers, "C1")
+    assert cache.exists("C1") and not cache.exists("C9")
+
+    clock.now += CMS.CUSTOMER_NEGATIVE_CACHE_TTL + 1
+    add_customer(customers, "C9")
+    assert cache.exists("C9")
+    assert cache.database_reads == 3
+
+    customers.delete_one({"customer_id": "C1"})
+    assert cache.exists("C1")
+    clock.now += CMS.CUSTOMER_CACHE_TTL
+    assert not cache.exists("C1")
+
+
+def test_workers_share_documents_through_the_shared_store(customers, clock):
+    store = CMS.LocalSharedStore()
+    first, second = (CMS.CustomerCache(CMS.SharedCacheBackend(store, CMS.CUSTOMER_CACHE_TTL)) for _ in range(2))
+    customer = {"_id": ObjectId(), "customer_id": "C1", "name": "Ann", "created_at": datetime(2024, 1, 1, 8, 30)}
+
+    first.store(customer)
+    assert second.get("C1") == customer
+    assert second.database_reads == 0
+
+    first.invalidate("C1")
+    assert second.get("C1") is None
+    assert second.database_reads == 1
+
+    first.store(customer)
+    clock.now += CMS.CUSTOMER_CACHE_TTL
+    assert store.get("cms:customer:C1") is None
+
+
+class BrokenStore:
+    def get(self, key):
+        raise ConnectionError("store unavailable")
+
+    set = delete = get
+
+
+def test_unreachable_shared_store_falls_back_to_the_database(customers):
+    cache = CMS.CustomerCache(CMS.SharedCacheBackend(BrokenStore(), CMS.CUSTOMER_CACHE_TTL))
+    add_customer(customers, "C1")
+    assert cache.get("C1")["customer_id"] == "C1"
+    cache.store({"customer_id": "C2"})
+    cache.invalidate("C2")
+    assert cache.stats()["misses"] == 1
+
+
+def test_backend_selection():
+    assert isinstance(CMS.create_customer_cache_backend("local-shared"), CMS.SharedCacheBackend)
+    assert isinstance(CMS.create_customer_cache_backend("memory"), CMS.TTLCache)
@@ -0,0 +1,51 @@
+"""create_customer relies on the unique indexes, not a lookup, to reject duplicate signups."""
+import pytest
+
+import CMS
+
+DUPLICATE = b'<message>Customer already exists with this email or Firebase UID</message>'
+
+
+def signup(soap, firebase_uid, email, name="Ann"):
+    return soap('/customerService', (
+        f'<create_customer><firebaseUID>{firebase_uid}</firebaseUID><name>{name}</name>'
+        f'<email>{email}</email><phone>0771234567</phone></create_customer>'
+    ))
+
+
+@pytest.fixture
+def no_lookups(monkeypatch):
+    """Fail any read of the customers collection during a signup"""
+    def find_one(*args, **kwargs):
+        raise AssertionError("create_customer looked the customer up before inserting")
+    monkeypatch.setattr(CMS.customers_collection, "find_one", find_one)
+
+
+def test_signup_is_a_single_insert(soap, database, no_lookups):
+    response = signup(soap, "U1", "ann@example.com")
+    assert b'<status>Success</status>' in response.data
+    assert database[CMS.COLLECTION_NAME].count_documents({}) == 1
+
+
+@pytest.mark.parametrize("firebase_uid, email", [
+    ("U1", "other@example.com"),
+    ("U2", "ann@example.com"),
+    ("U1", "ann@example.com"),
+])
+def test_duplicate_uid_or_email_is_rejected_by_the_index(soap, database, no_lookups, firebase_uid, email):
+    signup(soap, "U1", "ann@example.com")
+    response = signup(soap, firebase_uid, email, name="Impostor")
+    assert response.status_code == 200
+    assert b'<status>Error</status>' in response.data and DUPLICATE in response.data
+
+    customers = list(database[CMS.COLLECTION_NAME].find())
+    assert [(customer["customer_id"], customer["name"]) for customer in customers] == [("U1", "Ann")]
+
+
+def test_rejected_signup_is_not_cached_as_a_customer(soap, database):
+    signup(soap, "U1", "ann@example.com")
+    signup(soap, "U2", "ann@example.com")
+    assert CMS.customer_cache.exists("U1")
+    assert not CMS.customer_cache.exists("U2")
+    response = soap('/customerService', '<get_customer><customer_id>U2</customer_id></get_customer>')
+    assert b'<status>Error</status>' in response.data
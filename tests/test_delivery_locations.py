@@ -0,0 +1,101 @@
+"""getDeliveryLocation(s): one $lookup aggregation per request, cached per order until it changes."""
+import re
+
+import pytest
+
+import CMS
+
+
+@pytest.fixture
+def aggregations(database, monkeypatch):
+    """orderIDs asked for by each delivery-location aggregation"""
+    asked = []
+    aggregate = CMS.orders_collection.aggregate
+
+    def recording(pipeline, *args, **kwargs):
+        if any("$lookup" in stage for stage in pipeline):
+            match = pipeline[0]["$match"]["orderID"]
+            asked.append(sorted(match["$in"]) if isinstance(match, dict) else [match])
+        return aggregate(pipeline, *args, **kwargs)
+    monkeypatch.setattr(CMS.orders_collection, "aggregate", recording)
+    return asked
+
+
+@pytest.fixture
+def route(create_customer, create_order, database):
+    create_customer("C1", 6.93, 79.85)
+    create_customer("C2")
+    for order_id, customer_id in (("O1", "C1"), ("O2", "C1"), ("O3", "C2")):
+        create_order(order_id, customer_id)
+
+
+def locate(client, order_id):
+    body = client.post('/getDeliveryLocation', data=f'<get_delivery_location><orderID>{order_id}</orderID></get_delivery_location>')
+    return body.get_data(as_text=True)
+
+
+def locate_all(client, *order_ids):
+    body = ''.join(f'<orderID>{order_id}</orderID>' for order_id in order_ids)
+    text = client.post('/getDeliveryLocations', data=f'<get_delivery_locations>{body}</get_delivery_locations>').get_data(as_text=True)
+    return re.findall(r'<location><(?:orderID>([^<]*)</orderID><status>Error</status><message>([^<]*)</message>'
+                      r'|status>Success</status><orderID>([^<]*)</orderID>)', text)
+
+
+def test_repeated_polls_are_served_from_the_cache(client, route, aggregations):
+    first = locate(client, "O1")
+    assert '<order_status>pending</order_status>' in first and '<latitude>6.93</latitude>' in first
+    assert locate(client, "O1") == first
+    assert aggregations == [["O1"]]
+
+
+def test_status_update_invalidates_the_order(client, route, aggregations):
+    locate(client, "O1")
+    locate(client, "O2")
+    client.post('/api/updateStatus', data='<update_order_status><orderID>O1</orderID><status>shipped</status></update_order_status>')
+    assert '<order_status>shipped</order_status>' in locate(client, "O1")
+    locate(client, "O2")
+    assert aggregations == [["O1"], ["O2"], ["O1"]]
+
+
+def test_batch_update_invalidates_only_modified_orders(client, route, aggregations):
+    locate_all(client, "O1", "O2")
+    client.post('/api/updateStatusBatch', data=(
+        '<update_order_status_batch>'
+        '<update_order_status><orderID>O1</orderID><status>pending</status></update_order_status>'
+        '<update_order_status><orderID>O2</orderID><status>delivered</status></update_order_status>'
+        '</update_order_status_batch>'))
+    locate_all(client, "O1", "O2")
+    assert aggregations == [["O1", "O2"], ["O2"]]
+
+
+def test_customer_moves_are_seen_once_the_entry_expires(client, database, route, aggregations, monkeypatch):
+    locate(client, "O1")
+    database[CMS.COLLECTION_NAME].update_one({"customer_id": "C1"}, {"$set": {"current_location.latitude": 7.29}})
+    assert '<latitude>6.93</latitude>' in locate(client, "O1")
+
+    CMS.delivery_location_cache.clear()
+    monkeypatch.setattr(CMS.delivery_location_cache, "ttl", -1)
+    assert '<latitude>7.29</latitude>' in locate(client, "O1")
+    assert '<latitude>7.29</latitude>' in locate(client, "O1")
+    assert len(aggregations) == 3
+
+
+def test_route_lookup_reports_each_order(client, route, aggregations):
+    locate(client, "O2")
+    results = locate_all(client, "O1", "O2", "O9", "O3", "O1", "")
+    assert results == [
+        ('', '', 'O1'), ('', '', 'O2'),
+        ('O9', 'Order not found', ''),
+        ('O3', 'No delivery location found for customer', ''),
+        ('', '', 'O1'),
+        ('', 'Order ID is required in payload', ''),
+    ]
+    # The cached order is skipped, duplicates and blanks are asked for once
+    assert aggregations == [["O2"], ["O1", "O3", "O9"]]
+
+
+def test_single_lookup_errors(client, route, database):
+    assert '<message>Order not found</message>' in locate(client, "O9")
+    assert '<message>Order ID is required in payload</message>' in locate(client, "")
+    database[CMS.COLLECTION_NAME].delete_one({"customer_id": "C2"})
+    assert '<message>Customer not found</message>' in locate(client, "O3")
@@ -0,0 +1,78 @@
+"""Dispatch batching: plan_dispatch_batches and the plan_dispatch_batches operation."""
+import random
+import re
+from collections import Counter
+
+import pytest
+
+import CMS
+
+pytest.importorskip("numpy")
+
+
+def backlog(order_count, seed=7):
+    """Pending orders of customers scattered around Colombo and Kandy, plus edge cases"""
+    rng = random.Random(seed)
+    centres = [(6.93, 79.85), (7.29, 80.63)]
+    locations = {}
+    for number in range(40):
+        latitude, longitude = centres[number % 2]
+        locations[f"C{number}"] = (rng.gauss(latitude, 0.03), rng.gauss(longitude, 0.03))
+    locations["C-sea"] = (-5.0, 65.0)
+    orders = [{"orderID": f"O{number}", "customer_id": f"C{rng.randrange(40)}",
+               "priority": rng.choice(("high", "medium")), "totalAmount": 10}
+              for number in range(order_count)]
+    orders.append({"orderID": "O-sea", "customer_id": "C-sea", "priority": "high", "totalAmount": 1})
+    orders.append({"orderID": "O-lost", "customer_id": "C-unknown", "priority": "high", "totalAmount": 1})
+    return orders, locations
+
+
+@pytest.mark.parametrize("max_batch_size", [1, 7, 25, 1000])
+def test_batches_respect_the_size_cap(database, max_batch_size):
+    orders, locations = backlog(300)
+    batches, unassigned = CMS.plan_dispatch_batches(orders, locations, max_batch_size)
+
+    sizes = [len(batch["orders"]) for batch in batches]
+    assert max(sizes) <= max_batch_size
+    # Every order is batched once or reported unassigned
+    batched = [order["orderID"] for batch in batches for order in batch["orders"]]
+    assert len(batched) == len(set(batched))
+    assert sorted(batched + [order["orderID"] for order, _ in unassigned]) == sorted(o["orderID"] for o in orders)
+    assert dict((order["orderID"], reason) for order, reason in unassigned) == {
+        "O-sea": "out_of_area", "O-lost": "no_location"}
+
+    # Each district and priority is cut into the fewest batches, of near-equal size
+    groups = Counter((batch["district"], batch["priority"]) for batch in batches)
+    for (district, priority), batch_count in groups.items():
+        group_sizes = [len(batch["orders"]) for batch in batches
+                       if (batch["district"], batch["priority"]) == (district, priority)]
+        assert batch_count == -(-sum(group_sizes) // max_batch_size)
+        assert max(group_sizes) - min(group_sizes) <= 1
+
+
+def test_district_filter_keeps_one_district(database):
+    orders, locations = backlog(100)
+    batches, _ = CMS.plan_dispatch_batches(orders, locations, 10, district="Kandy")
+    assert batches and {batch["district"] for batch in batches} == {"Kandy"}
+
+
+@pytest.fixture
+def pending_orders(create_customer, create_order):
+    for number in range(7):
+        customer_id = create_customer(f"C{number}", 6.93 + number * 0.001, 79.85)
+        create_order(f"O{number}", customer_id, priority='high')
+
+
+def test_operation_caps_batches(soap, pending_orders):
+    response = soap('/orderService', '<plan_dispatch_batches><max_batch_size>3</max_batch_size></plan_dispatch_batches>')
+    sizes = [int(size) for size in re.findall(rb'<size>(\d+)</size>', response.data)]
+    assert sorted(sizes) == [2, 2, 3]
+    assert b'<order_count>7</order_count><batch_count>3</batch_count>' in response.data
+
+
+@pytest.mark.parametrize("max_batch_size", ["0", str(CMS.MAX_DISPATCH_BATCH_SIZE + 1), "many"])
+def test_operation_rejects_batch_sizes_outside_the_cap(soap, pending_orders, max_batch_size):
+    response = soap('/orderService', f'<plan_dispatch_batches><max_batch_size>{max_batch_size}</max_batch_size>'
+                                     '</plan_dispatch_batches>')
+    assert b'<status>Error</status>' in response.data
+    assert b'max_batch_size' in response.data
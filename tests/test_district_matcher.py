@@ -0,0 +1,49 @@
+"""District detection from free-text addresses against the shipped district_coordinates.xml."""
+import pytest
+
+import CMS
+
+
+@pytest.fixture(scope="module", autouse=True)
+def districts(tmp_path_factory):
+    CMS.load_district_coordinates(cache_path=str(tmp_path_factory.mktemp("districts") / "districts.cache"))
+
+
+def detect(address):
+    match = CMS.detect_district_from_address(address)
+    return match and (match["district"], match["match_type"], match["matched_text"])
+
+
+@pytest.mark.parametrize("address", [
+    "Matarapola Estate, Hill Street",
+    "No 12, Temple Lane, Near the post office",
+    "Colombage Mawatha",
+    "Kandyan Arts Centre",
+])
+def test_names_and_aliases_only_match_whole_words(address):
+    assert detect(address) is None
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("No 5, Station Road, Matara", ("Matara", "district_name", "Matara")),
+    ("Main Street, MATARA.", ("Matara", "district_name", "Matara")),
+    ("Sea View, Galle-Matara Road", ("Matara", "district_name", "Matara")),
+    ("No 7, Temple Lane, NE", ("Nuwara Eliya", "alias", "ne")),
+])
+def test_whole_words_match_regardless_of_case_and_punctuation(address, expected):
+    assert detect(address) == expected
+
+
+def test_longest_match_wins_over_earlier_shorter_ones():
+    # "Galle Road" comes first, but "kegalle" is the longer candidate
+    assert detect("No 385, Galle Road, Kegalle") == ("Kegalle", "district_name", "Kegalle")
+    assert detect("Lake Road, Nuwara Eliya") == ("Nuwara Eliya", "district_name", "Nuwara Eliya")
+
+
+def test_district_name_wins_over_an_alias_of_the_same_text():
+    assert detect("Union Place, Colombo") == ("Colombo", "district_name", "Colombo")
+
+
+def test_earliest_of_equally_long_candidates_wins():
+    assert detect("Kandy Road, Galle") == ("Kandy", "district_name", "Kandy")
+    assert detect("Galle Road, Kandy") == ("Galle", "district_name", "Galle")
@@ -0,0 +1,68 @@
+"""resolve_district: whole-token matches, the fuzzy fallback and the resolved-address cache."""
+import pytest
+
+import CMS
+
+
+@pytest.fixture(scope="module", autouse=True)
+def districts(tmp_path_factory):
+    CMS.load_district_coordinates(cache_path=str(tmp_path_factory.mktemp("districts") / "districts.cache"))
+
+
+@pytest.fixture
+def resolutions(monkeypatch):
+    cache = CMS.LRUCache(3)
+    monkeypatch.setattr(CMS, "district_resolution_cache", cache)
+    return cache
+
+
+def resolved(address):
+    result = CMS.resolve_district(address)
+    return result and (result["district"], result["match_type"], result["confidence"])
+
+
+def test_whole_tokens_resolve_with_full_confidence(resolutions):
+    assert resolved("12 Main St, Nuwara Eliya") == ("Nuwara Eliya", "district_name", 1.0)
+    assert resolved("HAMBANTOTA") == ("Hambantota", "district_name", 1.0)
+    # A bare short code is a plausible but weaker hit
+    assert resolved("No 5, NE") == ("Nuwara Eliya", "alias", 0.8)
+
+
+@pytest.mark.parametrize("address, district", [
+    ("Kandyy Road", "Kandy"),
+    ("Colmbo 7", "Colombo"),
+    ("Anuradhapur", "Anuradhapura"),
+    ("Kegale", "Kegalle"),
+])
+def test_misspellings_fall_back_to_fuzzy_matches(resolutions, address, district):
+    name, match_type, confidence = resolved(address)
+    assert (name, match_type) == (district, "fuzzy")
+    assert 0.5 < confidence < 0.9
+
+
+@pytest.mark.parametrize("address", ["Matarapola", "12345 67890", "Colm", ""])
+def test_no_district_within_reach(resolutions, address):
+    assert CMS.resolve_district(address) is None
+
+
+def test_edit_distance_stops_past_the_bound():
+    assert CMS._bounded_edit_distance("colmbo", "colombo", 2) == 1
+    assert CMS._bounded_edit_distance("kandy", "kegalle", 2) == 3
+    assert CMS._bounded_edit_distance("galle", "anuradhapura", 2) == 3
+
+
+def test_cache_is_keyed_by_the_normalized_address(resolutions):
+    first = CMS.resolve_district("No. 4, Galle Road, COLOMBO")
+    first["district"] = "tampered"
+    assert CMS.resolve_district("no 4 galle road colombo")["district"] == "Colombo"
+    assert CMS.resolve_district("Nowhere at all") is None
+    assert CMS.resolve_district("nowhere, at all!") is None
+    assert (resolutions.hits, resolutions.misses) == (2, 2)
+
+
+def test_cache_stays_within_its_size(resolutions):
+    for address in ("Galle", "Matara", "Jaffna", "Kandy"):
+        CMS.resolve_district(address)
+    assert CMS.get_district_resolver_stats()["size"] == 3
+    CMS.resolve_district("Galle")
+    assert resolutions.misses == 5
@@ -0,0 +1,99 @@
+"""find_nearby. mongomock has no geo operators, so the indexed customer query is replaced by
+an in-memory evaluation of the filter the service sends; everything around it is real."""
+import re
+
+import pytest
+
+import CMS
+
+
+def evaluate_geo_filter(query_filter, customers):
+    """What MongoDB answers for a nearby_customer_filter: $nearSphere nearest first, $geoWithin in any order"""
+    condition = query_filter["current_location.geo"]
+    located = [customer for customer in customers if customer.get("current_location", {}).get("geo")]
+    if "$nearSphere" in condition:
+        longitude, latitude = condition["$nearSphere"]["$geometry"]["coordinates"]
+        ranked = []
+        for customer in located:
+            customer_longitude, customer_latitude = customer["current_location"]["geo"]["coordinates"]
+            distance = CMS.great_circle_km(latitude, longitude, customer_latitude, customer_longitude) * 1000
+            if distance <= condition["$nearSphere"]["$maxDistance"]:
+                ranked.append((distance, customer))
+        return [customer for _, customer in sorted(ranked, key=lambda entry: entry[0])]
+    ring = condition["$geoWithin"]["$geometry"]["coordinates"][0]
+    (min_longitude, min_latitude), (max_longitude, max_latitude) = ring[0], ring[2]
+    return [customer for customer in located
+            if min_longitude <= customer["current_location"]["geo"]["coordinates"][0] <= max_longitude
+            and min_latitude <= customer["current_location"]["geo"]["coordinates"][1] <= max_latitude]
+
+
+@pytest.fixture
+def geo_queries(database, monkeypatch):
+    """Serve find_nearby_customers in memory and record the filters it was asked for"""
+    filters = []
+
+    def find_nearby_customers(query):
+        query_filter = CMS.nearby_customer_filter(query)
+        filters.append(query_filter)
+        customers = evaluate_geo_filter(query_filter, database[CMS.COLLECTION_NAME].find({}, {"_id": 0}))
+        return customers[:CMS.nearby_customer_limit(query)]
+
+    monkeypatch.setattr(CMS, "find_nearby_customers", find_nearby_customers)
+    return filters
+
+
+@pytest.fixture
+def colombo_customers(create_customer, create_order):
+    # Two customers in Colombo about 3.7 km apart, one in Kandy about 95 km away
+    for customer_id, latitude, longitude in (("near", 6.93, 79.85), ("close", 6.95, 79.88), ("kandy", 7.29, 80.63)):
+        create_customer(customer_id, latitude, longitude)
+        create_order(f"O-{customer_id}", customer_id, priority='high')
+    create_customer("nowhere")
+
+
+def tags(data, tag):
+    return re.findall(rf'<{tag}>([^<]*)</{tag}>'.encode(), data)
+
+
+def test_radius_search_sends_an_indexed_near_sphere_query(soap, colombo_customers, geo_queries):
+    response = soap('/orderService', '<find_nearby><target>customers</target><latitude>6.951</latitude>'
+                                     '<longitude>79.879</longitude><radius_km>10</radius_km></find_nearby>')
+    assert geo_queries == [{"current_location.geo": {"$nearSphere": {
+        "$geometry": {"type": "Point", "coordinates": [79.879, 6.951]}, "$maxDistance": 10000
+    }}}]
+    assert tags(response.data, 'customer_id') == [b'close', b'near']
+    distances = [float(value) for value in tags(response.data, 'distance_km')]
+    assert distances == sorted(distances) and distances[-1] < 10
+
+
+def test_radius_search_respects_limit(soap, colombo_customers, geo_queries):
+    response = soap('/orderService', '<find_nearby><target>customers</target><latitude>6.93</latitude>'
+                                     '<longitude>79.85</longitude><radius_km>200</radius_km><limit>2</limit></find_nearby>')
+    assert tags(response.data, 'customer_id') == [b'near', b'close']
+
+
+def test_bounding_box_returns_orders_with_status(soap, colombo_customers, geo_queries):
+    body = ('<find_nearby><min_latitude>6.8</min_latitude><min_longitude>79.8</min_longitude>'
+            '<max_latitude>7.0</max_latitude><max_longitude>80.0</max_longitude>{}</find_nearby>')
+    response = soap('/orderService', body.format(''))
+    assert "$geoWithin" in geo_queries[0]["current_location.geo"]
+    assert sorted(tags(response.data, 'orderID')) == [b'O-close', b'O-near']
+    assert not tags(response.data, 'distance_km')
+
+    delivered = soap('/orderService', body.format('<status>delivered</status>'))
+    assert tags(delivered.data, 'count') == [b'0']
+
+
+def test_invalid_query_is_a_soap_error(soap, colombo_customers, geo_queries):
+    response = soap('/orderService', '<find_nearby><latitude>6.93</latitude></find_nearby>')
+    assert response.status_code == 200
+    assert b'<status>Error</status>' in response.data
+    assert geo_queries == []
+
+
+def test_database_failure_is_a_soap_error(soap, colombo_customers):
+    # Without the stand-in the real query reaches mongomock, which rejects $nearSphere
+    response = soap('/orderService', '<find_nearby><latitude>6.93</latitude><longitude>79.85</longitude>'
+                                     '<radius_km>5</radius_km></find_nearby>')
+    assert response.status_code == 200
+    assert b'<find_nearby_response><status>Error</status><message>Database error: ' in response.data
@@ -0,0 +1,51 @@
+"""Index bootstrap (ensure_indexes) and the --check-indexes query-plan report."""
+import mongomock
+
+import CMS
+
+
+def required_names():
+    return {f"{collection}.{index['name']}" for collection, indexes in CMS.REQUIRED_INDEXES.items() for index in indexes}
+
+
+def test_ensure_indexes_is_idempotent():
+    database = mongomock.MongoClient()[CMS.DB_NAME]
+    for _ in range(2):
+        ensured, errors = CMS.ensure_indexes(database)
+        assert (set(ensured), errors) == (required_names(), [])
+    events = database[CMS.ORDER_EVENTS_COLLECTION_NAME].index_information()
+    assert events["created_at_ttl"]["expireAfterSeconds"] == 7 * 24 * 3600
+    assert database[CMS.ORDERS_COLLECTION_NAME].index_information()["orderID_unique"]["unique"]
+
+
+def test_conflicting_index_is_reported_not_raised():
+    database = mongomock.MongoClient()[CMS.DB_NAME]
+    database[CMS.PACKAGES_COLLECTION_NAME].create_index([("status", 1)], name="package_id_unique")
+    ensured, errors = CMS.ensure_indexes(database)
+    assert f"{CMS.PACKAGES_COLLECTION_NAME}.package_id_unique" not in ensured
+    assert len(errors) == 1 and errors[0].startswith(f"{CMS.PACKAGES_COLLECTION_NAME}.package_id_unique: ")
+
+
+def test_every_query_shape_is_served_by_an_index(database):
+    report = CMS.diagnose_query_plans(database)
+    assert len(report) == len(CMS.QUERY_SHAPES)
+    assert [entry["query"] for entry in report if entry["collection_scan"]] == []
+
+
+def test_missing_index_shows_up_as_a_collection_scan(database):
+    database[CMS.PACKAGES_COLLECTION_NAME].drop_index("package_id_unique")
+    scans = [(entry["query"], entry["stages"]) for entry in CMS.diagnose_query_plans(database) if entry["collection_scan"]]
+    assert scans == [("package lookup by package_id", ["COLLSCAN"])]
+
+
+def test_plan_stages_walks_server_explain_output():
+    winning_plan = {
+        "stage": "SORT",
+        "inputStage": {"stage": "OR", "inputStages": [
+            {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+            {"stage": "COLLSCAN"},
+        ]},
+    }
+    assert CMS._plan_stages(winning_plan) == ["SORT", "OR", "FETCH", "IXSCAN", "COLLSCAN"]
+    # Slot-based engine plans nest the classic tree under queryPlan
+    assert CMS._plan_stages({"queryPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}) == ["FETCH", "IXSCAN"]
@@ -0,0 +1,94 @@
+"""Request metrics, the Mongo command listener and the /metrics exposition."""
+import re
+from types import SimpleNamespace
+
+import CMS
+
+SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+
+
+def scrape(client):
+    """/metrics as {(name, labels): value}; labels is the raw label text"""
+    text = client.get('/metrics').get_data(as_text=True)
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith('#'):
+            name, labels, value = SAMPLE.match(line).groups()
+            samples[name, labels or ''] = float(value)
+    return samples
+
+
+def served(response):
+    """Close a test-client response; metrics are recorded when the server closes the body"""
+    with response:
+        return response.get_data()
+
+
+def changes(before, after):
+    return {key: value - before.get(key, 0) for key, value in after.items() if value != before.get(key, 0)}
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = CMS.Histogram("latency", "Latency", ("route",), (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 7):
+        histogram.observe(("/a",), value)
+    assert histogram.render() == [
+        "# HELP latency Latency", "# TYPE latency histogram",
+        'latency_bucket{route="/a",le="0.1"} 2',
+        'latency_bucket{route="/a",le="1.0"} 3',
+        'latency_bucket{route="/a",le="+Inf"} 4',
+        'latency_sum{route="/a"} 7.65',
+        'latency_count{route="/a"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = CMS.Counter("hits", "Hits", ("path",))
+    counter.inc(('say "hi"\\\n',), 2)
+    assert counter.render()[-1] == 'hits{path="say \\"hi\\"\\\\\\n"} 2'
+
+
+def test_soap_request_is_counted_by_operation(client, soap, create_customer):
+    create_customer("C1")
+    before = scrape(client)
+    served(soap('/orderService', '<get_customer_orders><customer_id>C1</customer_id></get_customer_orders>'))
+    delta = changes(before, scrape(client))
+
+    labels = 'route="/orderService",operation="get_customer_orders"'
+    assert delta[('cms_requests_total', labels + ',status="200"')] == 1
+    for phase in CMS.REQUEST_PHASES:
+        assert delta[('cms_request_duration_seconds_count', f'{labels},phase="{phase}"')] == 1
+    assert delta[('cms_request_size_bytes_count', 'route="/orderService"')] == 1
+    assert ('cms_request_errors_total', labels) not in delta
+
+
+def test_soap_errors_and_unknown_routes_count_as_errors(client, soap):
+    before = scrape(client)
+    served(soap('/orderService', '<get_customer_orders><customer_id>nobody</customer_id></get_customer_orders>'))
+    served(client.get('/no/such/page'))
+    delta = changes(before, scrape(client))
+    assert delta[('cms_request_errors_total', 'route="/orderService",operation="get_customer_orders"')] == 1
+    assert delta[('cms_requests_total', 'route="unmatched",operation="",status="404"')] == 1
+
+
+def test_streamed_responses_are_sized_once_the_body_is_closed(client, create_customer, create_order):
+    create_customer("C1")
+    create_order("O1", "C1")
+    before = scrape(client)
+    body = served(client.get('/getOrders/C1'))
+    delta = changes(before, scrape(client))
+    assert delta[('cms_response_size_bytes_sum', 'route="/getOrders/<customerID>"')] == len(body)
+
+
+def test_mongo_commands_feed_the_current_request(client):
+    before = scrape(client)
+    timing = CMS.start_request_timing("/test")
+    CMS.mongo_command_metrics.succeeded(SimpleNamespace(command_name="find", duration_micros=1500))
+    CMS.mongo_command_metrics.failed(SimpleNamespace(command_name="insert", duration_micros=500))
+    assert timing.db == 0.002
+    CMS.finish_request_timing(timing, 200)
+
+    delta = changes(before, scrape(client))
+    assert delta[('cms_mongo_command_duration_seconds_count', 'command="find"')] == 1
+    assert delta[('cms_mongo_command_failures_total', 'command="insert"')] == 1
+    assert ('cms_mongo_command_failures_total', 'command="find"') not in delta
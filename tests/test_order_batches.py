@@ -0,0 +1,81 @@
+"""Batch order ingestion: create_orders_batch and /api/createOrdersStream."""
+import json
+import re
+
+import pytest
+
+import CMS
+
+
+def order_xml(order_id, customer_id, total_amount='10'):
+    return (f'<order><orderID>{order_id}</orderID><customer_id>{customer_id}</customer_id>'
+            f'<totalAmount>{total_amount}</totalAmount></order>')
+
+
+def results(data):
+    """(orderID, status, message) per <order_result>, in response order"""
+    return re.findall(rb'<order_result><orderID>([^<]*)</orderID><customer_id>[^<]*</customer_id>'
+                      rb'<status>([^<]*)</status><message>([^<]*)</message></order_result>', data)
+
+
+def footer(data, tag):
+    return int(re.search(rf'</results>.*<{tag}>(\d+)</{tag}>'.encode(), data).group(1))
+
+
+@pytest.fixture
+def customer(create_customer):
+    return create_customer("C1", 6.93, 79.85)
+
+
+def test_duplicate_order_ids_within_a_batch(soap, customer, database):
+    response = soap('/orderService', '<create_orders_batch>' + order_xml('B1', customer) + order_xml('B2', customer)
+                    + order_xml('B1', customer, '99') + '</create_orders_batch>')
+    outcomes = results(response.get_data())
+    assert [(order_id, status) for order_id, status, _ in outcomes] == [
+        (b'B1', b'Success'), (b'B2', b'Success'), (b'B1', b'Error')]
+    assert outcomes[2][2].startswith(b'Database error')
+    assert (footer(response.get_data(), 'created'), footer(response.get_data(), 'failed')) == (2, 1)
+    # The first B1 wins and only the inserted orders are counted and announced
+    assert database[CMS.ORDERS_COLLECTION_NAME].find_one({"orderID": "B1"})["totalAmount"] == 10
+    assert database[CMS.ORDER_COUNTERS_COLLECTION_NAME].find_one({"_id": "all"})["total"] == 2
+    assert sorted(event["orderID"] for event in database[CMS.ORDER_EVENTS_COLLECTION_NAME].find()) == ["B1", "B2"]
+
+
+def test_order_id_already_stored_fails_only_that_order(soap, customer, create_order):
+    create_order('B1', customer)
+    response = soap('/orderService', '<create_orders_batch>' + order_xml('B1', customer)
+                    + order_xml('B3', customer) + '</create_orders_batch>')
+    assert [(order_id, status) for order_id, status, _ in results(response.get_data())] == [
+        (b'B1', b'Error'), (b'B3', b'Success')]
+
+
+def test_partial_failures_keep_input_order(soap, customer, database):
+    response = soap('/orderService', '<create_orders_batch>' + order_xml('P1', customer) + order_xml('P2', 'nobody')
+                    + order_xml('P3', customer, 'lots') + order_xml('', customer) + order_xml('P5', customer)
+                    + '</create_orders_batch>')
+    outcomes = results(response.get_data())
+    assert [status for _, status, _ in outcomes] == [b'Success', b'Error', b'Error', b'Error', b'Success']
+    assert outcomes[1][2] == b'Customer not found'
+    assert b'<status>Success</status><orders_count>5</orders_count><created>2</created><failed>3</failed>' \
+        in response.get_data()
+    assert sorted(database[CMS.ORDERS_COLLECTION_NAME].distinct("orderID")) == ["P1", "P5"]
+
+
+def test_groups_are_inserted_separately(soap, customer, monkeypatch):
+    monkeypatch.setattr(CMS, "ORDER_INSERT_BATCH_SIZE", 2)
+    body = ''.join(order_xml(f'G{number}', customer) for number in range(5))
+    response = soap('/orderService', f'<create_orders_batch>{body}</create_orders_batch>')
+    assert footer(response.get_data(), 'created') == 5
+
+
+def test_ndjson_stream_reports_bad_lines(client, customer):
+    lines = [
+        json.dumps({"orderID": "N1", "customer_id": customer, "totalAmount": 5}),
+        "{not json",
+        json.dumps({"orderID": "N1", "customer_id": customer, "totalAmount": 6}),
+        json.dumps({"orderID": "N2", "customer_id": customer, "totalAmount": 7}),
+    ]
+    response = client.post('/api/createOrdersStream', data='\n'.join(lines) + '\n', content_type='application/x-ndjson')
+    data = response.get_data()
+    assert [status for _, status, _ in results(data)] == [b'Success', b'Error', b'Error', b'Success']
+    assert (footer(data, 'created'), footer(data, 'failed')) == (2, 2)
@@ -0,0 +1,81 @@
+"""Order counters: $inc maintenance, drift found by --check-counters, and rebuilds."""
+import re
+from datetime import datetime
+
+import pytest
+
+import CMS
+
+
+@pytest.fixture
+def orders(client, create_customer, create_order):
+    """C1 (Colombo) has O1 and O2, C2 (no location) has O3; O1 is shipped, then a batch ships O2 and O3"""
+    create_customer("C1", 6.93, 79.85)
+    create_customer("C2")
+    for order_id, customer_id in (("O1", "C1"), ("O2", "C1"), ("O3", "C2")):
+        create_order(order_id, customer_id)
+    client.post('/api/updateStatus', data='<update_order_status><orderID>O1</orderID>'
+                                          '<status>shipped</status></update_order_status>')
+    client.post('/api/updateStatusBatch', data=(
+        '<update_order_status_batch>'
+        '<update_order_status><orderID>O2</orderID><status>shipped</status></update_order_status>'
+        '<update_order_status><orderID>O3</orderID><status>on.hold$</status></update_order_status>'
+        '<update_order_status><orderID>O1</orderID><status>shipped</status></update_order_status>'
+        '</update_order_status_batch>'))
+
+
+def counters(database, counter_id):
+    return database[CMS.ORDER_COUNTERS_COLLECTION_NAME].find_one({"_id": counter_id})
+
+
+def nonzero(status_counts):
+    # Decrements leave zero counts behind; they are not drift
+    return {status: count for status, count in status_counts.items() if count}
+
+
+def test_maintained_counters_match_the_orders(database, orders):
+    today = f"day:{datetime.utcnow():%Y-%m-%d}"
+    assert nonzero(counters(database, "all")["status"]) == {"shipped": 2, "on%2Ehold%24": 1}
+    assert counters(database, "customer:C1")["total"] == 2
+    assert nonzero(counters(database, today)["districts"]["Colombo"]["status"]) == {"shipped": 2}
+    assert counters(database, today)["districts"][CMS.UNKNOWN_DISTRICT]["total"] == 1
+    assert CMS.rebuild_order_counters(database, write=False) == []
+
+
+def test_check_reports_drift_without_writing(database, orders):
+    collection = database[CMS.ORDER_COUNTERS_COLLECTION_NAME]
+    # A lost increment, an order written behind the service's back, and a stale counter
+    collection.update_one({"_id": "customer:C1"}, {"$inc": {"status.shipped": -1}})
+    database[CMS.ORDERS_COLLECTION_NAME].insert_one({
+        "orderID": "O4", "customer_id": "C9", "status": "pending", "created_at": datetime(2024, 1, 2)})
+    collection.insert_one({"_id": "customer:gone", "total": 1, "status": {"pending": 1}})
+    before = list(collection.find().sort("_id", 1))
+
+    assert CMS.rebuild_order_counters(database, write=False) == [
+        "all", "customer:C1", "customer:C9", "customer:gone", "day:2024-01-02"]
+    assert list(collection.find().sort("_id", 1)) == before
+
+
+def test_rebuild_repairs_drift(database, orders):
+    collection = database[CMS.ORDER_COUNTERS_COLLECTION_NAME]
+    collection.update_one({"_id": "all"}, {"$inc": {"total": 5, "status.pending": 5}})
+    collection.delete_one({"_id": "customer:C2"})
+
+    assert CMS.rebuild_order_counters(database) == ["all", "customer:C2"]
+    assert CMS.rebuild_order_counters(database, write=False) == []
+    assert counters(database, "all")["total"] == 3
+    assert nonzero(counters(database, "customer:C2")["status"]) == {"on%2Ehold%24": 1}
+
+
+def test_order_summary_reads_the_counters(soap, orders):
+    response = soap('/orderService', '<get_order_summary><customer_id>C2</customer_id></get_order_summary>')
+    assert re.search(rb'<total>1</total>.*<name>on\.hold\$</name><count>1</count>', response.data)
+    invalid = soap('/orderService', '<get_order_summary><customer_id>C1</customer_id><date>today</date></get_order_summary>')
+    assert b'<status>Error</status>' in invalid.data
+
+
+@pytest.mark.parametrize("name", ["pending", "on.hold", "$set", "100%", "%2E"])
+def test_counter_field_names_round_trip(name):
+    field = CMS.counter_field(name)
+    assert '.' not in field and not field.startswith('$')
+    assert CMS.counter_name(field) == name
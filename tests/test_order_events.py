@@ -0,0 +1,100 @@
+"""Order event outbox: numbering, long-poll and SSE resume, and gap handling."""
+import re
+
+import pytest
+
+import CMS
+
+
+@pytest.fixture
+def event_feed(database, monkeypatch):
+    """A private tailer per test, stopped afterwards"""
+    feed = CMS.OrderEventFeed(poll_interval=0.05)
+    monkeypatch.setattr(CMS, "order_event_feed", feed)
+    yield feed
+    feed._pid = None
+    feed.wake()
+
+
+@pytest.fixture
+def orders(create_customer, create_order, client, event_feed):
+    """Events 1-3 create O1 (C1), O2 (C2) and O3 (C1); event 4 ships O1"""
+    create_customer("C1")
+    create_customer("C2")
+    for order_id, customer_id in (("O1", "C1"), ("O2", "C2"), ("O3", "C1")):
+        create_order(order_id, customer_id)
+    response = client.post('/api/updateStatus', data='<update_order_status><orderID>O1</orderID>'
+                                                     '<status>shipped</status></update_order_status>')
+    assert b'<status>Success</status>' in response.data
+
+
+def poll(client, query):
+    data = client.get(f'/api/orderEvents?timeout=0&{query}').data
+    sequences = [int(seq) for seq in re.findall(rb'<event><seq>(\d+)</seq>', data)]
+    return sequences, int(re.search(rb'<next_token>(\d+)</next_token>', data).group(1))
+
+
+def test_events_are_numbered_in_write_order(database, orders):
+    events = list(database[CMS.ORDER_EVENTS_COLLECTION_NAME].find({}, {"_id": 0}).sort("seq", 1))
+    assert [(event["seq"], event["type"], event["orderID"]) for event in events] == [
+        (1, "order_created", "O1"), (2, "order_created", "O2"), (3, "order_created", "O3"), (4, "status_changed", "O1")]
+    assert (events[3]["previous_status"], events[3]["status"]) == ("pending", "shipped")
+
+
+def test_long_poll_resumes_after_token(client, orders):
+    assert poll(client, 'after=0') == ([1, 2, 3, 4], 4)
+    assert poll(client, 'after=2') == ([3, 4], 4)
+    assert poll(client, 'after=4') == ([], 4)
+
+
+def test_long_poll_pages_resume_where_the_page_ended(client, orders):
+    assert poll(client, 'after=0&limit=3') == ([1, 2, 3], 3)
+    assert poll(client, 'after=3&limit=3') == ([4], 4)
+
+
+def test_filtered_poll_token_skips_other_customers(client, orders):
+    # The token moves past C2's event, so the next poll does not scan it again
+    assert poll(client, 'after=0&customer_id=C1') == ([1, 3, 4], 4)
+    assert poll(client, 'after=1&customer_id=C2&limit=1') == ([2], 2)
+    assert poll(client, 'after=0&orderID=O1') == ([1, 4], 4)
+
+
+def test_tokens_older_than_the_buffer_are_read_from_the_collection(orders, event_feed):
+    # A feed started now buffers only events after 4, so token 1 predates it
+    event_feed.start()
+    assert event_feed.floor == 4
+    events, token = event_feed.wait(1, 10)
+    assert [event["seq"] for event in events] == [2, 3, 4] and token == 4
+
+
+def test_sse_resumes_from_last_event_id(client, orders):
+    response = client.get('/api/orderEvents/stream', headers={'Last-Event-ID': '2'}, buffered=False)
+    chunks = response.response
+    try:
+        assert next(chunks).startswith(b'retry: ')
+        messages = next(chunks).decode()
+    finally:
+        response.close()
+    assert re.findall(r'^id: (\d+)$', messages, re.MULTILINE) == ['3', '4']
+    assert 'event: status_changed' in messages
+
+
+def test_sse_id_only_message_carries_filtered_token(client, orders):
+    response = client.get('/api/orderEvents/stream?after=3&customer_id=C2', buffered=False)
+    chunks = response.response
+    try:
+        next(chunks)
+        assert next(chunks) == b'id: 4\n\n'
+    finally:
+        response.close()
+
+
+def test_events_behind_an_unwritten_sequence_are_held_back(orders, monkeypatch):
+    # Sequence 5 is reserved by a writer that has not inserted it yet; 6 is already there
+    assert CMS.reserve_event_sequence(2) == 5
+    CMS.order_events_collection.insert_one(dict(CMS.order_event("order_created", "O9", "C1", "pending"), seq=6))
+    assert CMS.read_order_events(4, 10) == ([], 4)
+    # Once the gap is older than ORDER_EVENT_GAP_TIMEOUT the writer is presumed failed
+    monkeypatch.setattr(CMS, "ORDER_EVENT_GAP_TIMEOUT", 0)
+    events, token = CMS.read_order_events(4, 10)
+    assert [event["seq"] for event in events] == [6] and token == 6
@@ -0,0 +1,48 @@
+"""Streamed /getOrders/<customerID> listings: the header count comes with the validators."""
+import re
+
+import pytest
+
+import CMS
+
+
+@pytest.fixture
+def history(client, create_customer, create_order):
+    create_customer("C1")
+    for i in range(5):
+        create_order(f"O{i}", "C1", total_amount=i + 1)
+    for order_id in ("O1", "O3"):
+        client.post('/api/updateStatus', data=f'<update_order_status><orderID>{order_id}</orderID>'
+                                              '<status>shipped</status></update_order_status>')
+
+
+@pytest.fixture
+def no_count_documents(monkeypatch):
+    def count_documents(*args, **kwargs):
+        raise AssertionError("the listing counted its orders with a separate query")
+    monkeypatch.setattr(type(CMS.orders_collection), "count_documents", count_documents)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("", ["O0", "O1", "O2", "O3", "O4"]),
+    ("?limit=2", ["O0", "O1"]),
+    ("?status=shipped", ["O1", "O3"]),
+    ("?status=shipped&limit=1", ["O1"]),
+    ("?status=returned", []),
+])
+def test_header_count_matches_the_streamed_orders(client, history, no_count_documents, query, expected):
+    body = client.get(f'/getOrders/C1{query}').get_data(as_text=True)
+    assert re.findall(r'<orderID>(\w+)</orderID>', body) == expected
+    assert f'<orders_count>{len(expected)}</orders_count>' in body
+
+
+def test_count_of_a_later_page(client, history, no_count_documents):
+    first = client.get('/getOrders/C1?limit=3').get_data(as_text=True)
+    cursor = re.search(r'<next_cursor>([^<]+)</next_cursor>', first).group(1)
+    rest = client.get(f'/getOrders/C1?limit=3&after={cursor}').get_data(as_text=True)
+    assert re.findall(r'<orderID>(\w+)</orderID>', rest) == ["O3", "O4"]
+    assert '<orders_count>2</orders_count>' in rest
+
+
+def test_unknown_customer_has_no_listing(client, history):
+    assert b'<message>Customer not found</message>' in client.get('/getOrders/C9').data
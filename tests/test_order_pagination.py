@@ -0,0 +1,92 @@
+"""Keyset pagination, status filter and field projection of get_customer_orders and /getOrders."""
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import CMS
+
+PAGE = ('<get_customer_orders><customer_id>C1</customer_id><limit>{limit}</limit>'
+        '<after>{after}</after>{extra}</get_customer_orders>')
+
+
+@pytest.fixture
+def orders(database, create_customer):
+    """Seven orders; O2, O3 and O4 share a created_at, so only _id orders them"""
+    create_customer("C1")
+    start = datetime(2024, 2, 1)
+    created = [start, start + timedelta(minutes=1)] + [start + timedelta(minutes=2)] * 3 + [
+        start + timedelta(minutes=3), start + timedelta(minutes=4)]
+    database[CMS.ORDERS_COLLECTION_NAME].insert_many([{
+        "_id": ObjectId(f"65f0000000000000000000{i:02x}"), "orderID": f"O{i}", "customer_id": "C1",
+        "totalAmount": 10.0 + i, "priority": "high" if i % 2 else "low", "status": "shipped" if i in (1, 4, 5) else "pending",
+        "created_at": created_at, "updated_at": created_at, "items": []
+    } for i, created_at in enumerate(created)])
+
+
+def page(soap, limit, after='', extra=''):
+    body = soap('/orderService', PAGE.format(limit=limit, after=after, extra=extra)).get_data(as_text=True)
+    cursor = re.search(r'<next_cursor>([^<]*)</next_cursor>', body)
+    return re.findall(r'<orderID>(\w+)</orderID>', body), cursor.group(1) if cursor else None, body
+
+
+def walk(fetch):
+    """Follow next_cursor until it runs out; returns the order IDs of each page"""
+    pages, after = [], ''
+    while True:
+        order_ids, after = fetch(after)
+        pages.append(order_ids)
+        if not after:
+            return pages
+
+
+def test_pages_cover_every_order_once_across_tied_timestamps(soap, orders):
+    pages = walk(lambda after: page(soap, 3, after)[:2])
+    assert pages == [["O0", "O1", "O2"], ["O3", "O4", "O5"], ["O6"]]
+
+
+def test_status_filter_pages_through_matching_orders_only(soap, orders):
+    pages = walk(lambda after: page(soap, 2, after, '<status>shipped</status>')[:2])
+    assert pages == [["O1", "O4"], ["O5"]]
+
+
+def test_exact_last_page_ends_with_an_empty_one(client, orders):
+    def fetch(after):
+        body = client.get(f'/getOrders/C1?limit=7&after={after}').get_data(as_text=True)
+        return re.findall(r'<orderID>(\w+)</orderID>', body), re.search(r'<next_cursor>([^<]*)<', body).group(1)
+    assert walk(fetch) == [[f"O{i}" for i in range(7)], []]
+
+
+def test_orders_inserted_behind_the_cursor_are_not_repeated(soap, database, orders):
+    first, after, _ = page(soap, 4)
+    database[CMS.ORDERS_COLLECTION_NAME].insert_one({
+        "orderID": "late", "customer_id": "C1", "status": "pending", "created_at": datetime(2024, 3, 1), "items": []})
+    rest = walk(lambda cursor: page(soap, 4, cursor or after)[:2])
+    assert first + sum(rest, []) == ["O0", "O1", "O2", "O3", "O4", "O5", "O6", "late"]
+
+
+def test_fields_project_the_listing(soap, client, orders):
+    _, _, body = page(soap, 1, extra='<fields>orderID,status</fields>')
+    assert re.search(r'<order>(.*?)</order>', body).group(1) == '<orderID>O0</orderID><status>pending</status>'
+
+    exported = client.get('/getOrders/C1?limit=1&fields=_id,totalAmount').get_data(as_text=True)
+    assert re.search(r'<order>(.*?)</order>', exported).group(1) == (
+        '<_id>65f000000000000000000000</_id><totalAmount>10.0</totalAmount>')
+
+
+@pytest.mark.parametrize("limit, after, extra, message", [
+    ("0", "", "", "limit must be between 1 and 1000"),
+    ("1001", "", "", "limit must be between 1 and 1000"),
+    ("ten", "", "", "limit must be an integer"),
+    ("5", "", "<fields>orderID,password</fields>", "Unknown order fields: password"),
+])
+def test_invalid_parameters_are_soap_errors(soap, orders, limit, after, extra, message):
+    _, _, body = page(soap, limit, after, extra)
+    assert f'<status>Error</status><message>{message}</message>' in body
+
+
+def test_tampered_cursor_is_rejected(soap, client, orders):
+    _, _, body = page(soap, 2, 'bm90IGEgY3Vyc29y')
+    assert '<status>Error</status>' in body
+    assert b'<status>Error</status>' in client.get('/getOrders/C1?after=%%%').data
@@ -0,0 +1,83 @@
+"""Durable package stores: the append-only log with snapshots, and the shared Mongo collection."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import CMS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST, SECOND, THIRD = (f"{i}0000000-0000-4000-8000-000000000000" for i in range(1, 4))
+
+
+def in_another_process(code, log_path):
+    """Run code with `store` bound to a LogPackageStore on log_path, in a separate interpreter"""
+    script = f"import CMS\nstore = CMS.LogPackageStore({log_path!r}, snapshot_every=3)\n{code}"
+    return subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True)
+
+
+def test_log_survives_a_restart(tmp_path):
+    log_path = str(tmp_path / "packages.log")
+    written = in_another_process(
+        f"store.create({FIRST!r}, 'Awaiting Packing')\n"
+        f"store.create({SECOND!r}, 'Awaiting Packing')\n"
+        f"store.update({FIRST!r}, 'Shipped')\n"
+        f"print(sorted(store.update_many([({SECOND!r}, 'Packed'), ({THIRD!r}, 'Lost')])))", log_path)
+    assert written.returncode == 0, written.stderr
+    assert written.stdout.strip() == repr([THIRD])
+
+    store = CMS.LogPackageStore(log_path, snapshot_every=3)
+    assert (store.get(FIRST), store.get(SECOND), store.get(THIRD), len(store)) == ("Shipped", "Packed", None, 2)
+
+
+def test_snapshot_folds_the_log(tmp_path):
+    log_path = str(tmp_path / "packages.log")
+    in_another_process(
+        "".join(f"store.create('{i}0000000-0000-4000-8000-000000000000', 'Awaiting Packing')\n" for i in range(1, 5)),
+        log_path)
+    with open(log_path + ".snapshot") as snapshot:
+        assert len(json.load(snapshot)) == 3
+    with open(log_path) as log:
+        assert log.read().count("\n") == 1
+
+    assert len(CMS.LogPackageStore(log_path)) == 4
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    log_path = str(tmp_path / "packages.log")
+    with open(log_path, "w") as log:
+        log.write(json.dumps([FIRST, "Packed"]) + "\n" + f'["{SECOND}", "Pac')
+    store = CMS.LogPackageStore(log_path)
+    assert (store.get(FIRST), store.get(SECOND)) == ("Packed", None)
+
+
+def test_a_second_process_cannot_open_the_log(tmp_path):
+    pytest.importorskip("fcntl")
+    log_path = str(tmp_path / "packages.log")
+    store = CMS.LogPackageStore(log_path)
+    store.create(FIRST, "Awaiting Packing")
+
+    refused = in_another_process("", log_path)
+    assert refused.returncode != 0
+    assert f"RuntimeError: Package log {log_path} is in use by another process" in refused.stderr
+    assert store.get(FIRST) == "Awaiting Packing"
+
+
+def test_mongo_store_is_shared_between_workers(database):
+    worker, other_worker = CMS.MongoPackageStore(), CMS.MongoPackageStore(database[CMS.PACKAGES_COLLECTION_NAME])
+    worker.create(FIRST, "Awaiting Packing")
+    worker.create(SECOND, "Awaiting Packing")
+    assert other_worker.get(FIRST) == "Awaiting Packing"
+
+    assert other_worker.update_many([(FIRST, "Packed"), (THIRD, "Lost"), (FIRST, "Shipped")]) == {THIRD}
+    assert not other_worker.update(THIRD, "Lost")
+    assert (worker.get(FIRST), worker.get(SECOND), worker.get(THIRD)) == ("Shipped", "Awaiting Packing", None)
+    assert len(worker) == 2
+
+
+def test_mongo_store_needs_a_connection(monkeypatch):
+    monkeypatch.setattr(CMS, "packages_collection", None)
+    with pytest.raises(RuntimeError, match="Database connection not available"):
+        CMS.MongoPackageStore().get(FIRST)
@@ -0,0 +1,82 @@
+"""Package IDs are canonicalized once at the SOAP boundary, whichever store backs them."""
+import re
+
+import pytest
+
+import CMS
+
+
+@pytest.fixture(params=["memory", "compact"])
+def packages(request, soap, monkeypatch):
+    monkeypatch.setattr(CMS, "package_store", CMS.create_package_store(request.param))
+
+    def call(body):
+        return soap('/orderService', body).get_data(as_text=True)
+    return call
+
+
+def new_package(packages):
+    return re.search(r'<new_package_response>([^<]+)<', packages('<new_package/>')).group(1)
+
+
+def package_status(packages, package_id):
+    body = packages(f'<get_package_status><package_id>{package_id}</package_id></get_package_status>')
+    return re.search(r'<get_package_status_response>([^<]+)<', body).group(1)
+
+
+def test_new_packages_get_canonical_ids(packages):
+    package_id = new_package(packages)
+    assert CMS.canonical_package_id(package_id) == package_id
+    assert package_status(packages, package_id) == "Awaiting Packing"
+
+
+def test_case_and_whitespace_are_normalized(packages):
+    package_id = new_package(packages)
+    packages(f'<update_package><package_id> {package_id.upper()} </package_id><status_code>Packed</status_code></update_package>')
+    assert package_status(packages, package_id) == "Packed"
+    assert package_status(packages, package_id.upper()) == "Packed"
+
+
+@pytest.mark.parametrize("spelling", [
+    lambda package_id: package_id.replace('-', ''),
+    lambda package_id: '{' + package_id + '}',
+    lambda package_id: 'urn:uuid:' + package_id,
+    lambda package_id: package_id[:-1],
+])
+def test_other_spellings_are_rejected(packages, spelling):
+    package_id = new_package(packages)
+    assert package_status(packages, spelling(package_id)) == "Error: Invalid package_id"
+    body = packages(f'<update_package><package_id>{spelling(package_id)}</package_id>'
+                    '<status_code>Lost</status_code></update_package>')
+    assert '<update_package_response>Error: Invalid package_id<' in body
+    assert package_status(packages, package_id) == "Awaiting Packing"
+
+
+def test_batch_reports_each_entry(packages):
+    package_id = new_package(packages)
+    unknown = "00000000-0000-4000-8000-000000000000"
+    body = packages(
+        '<update_packages>'
+        f'<package><package_id>{package_id.upper()}</package_id><status_code>Shipped</status_code></package>'
+        f'<package><package_id>{package_id.replace("-", "")}</package_id><status_code>Lost</status_code></package>'
+        f'<package><package_id>{unknown}</package_id><status_code>Lost</status_code></package>'
+        f'<package><package_id>{package_id}</package_id></package>'
+        '</update_packages>'
+    )
+    assert re.findall(r'<result>([^<]+)</result>', body) == [
+        "Success", "Error: Invalid package_id", "Error: Package not found", "Error: Missing package_id or status_code"]
+    assert package_status(packages, package_id) == "Shipped"
+
+
+def test_compact_store_only_knows_canonical_keys():
+    store = CMS.CompactPackageStore(capacity=4)
+    ids = [f"{0xabcdef00 + i:08x}-0000-4000-8000-00000000beef" for i in range(10)]
+    for package_id in ids:
+        store.create(package_id, "Awaiting Packing")
+    with pytest.raises(ValueError):
+        store.create(ids[0].upper(), "Packed")
+    assert store.get(ids[0].upper()) is None
+    assert not store.update(ids[1].replace('-', ''), "Packed")
+    assert store.update_many([(ids[2], "Packed"), (ids[3].upper(), "Packed")]) == {ids[3].upper()}
+    assert [store.get(package_id) for package_id in ids[:4]] == ["Awaiting Packing", "Awaiting Packing", "Packed", "Awaiting Packing"]
+    assert len(store) == 10
@@ -0,0 +1,55 @@
+"""The SOAP operation table: per-service registration, routing and the generated WSDL."""
+import re
+
+import pytest
+
+import CMS
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Register echo handlers for a parsed and a raw operation on orderService"""
+    calls = []
+    operations = dict(CMS.SOAP_OPERATIONS["orderService"])
+    for name in ("get_order", "create_orders_batch"):
+        operations[name] = {"handler": lambda payload, name=name: calls.append((name, payload)) or CMS.Response("ok"),
+                            "description": ""}
+    monkeypatch.setitem(CMS.SOAP_OPERATIONS, "orderService", operations)
+    return calls
+
+
+def test_every_registered_operation_has_a_schema():
+    registered = {name for operations in CMS.SOAP_OPERATIONS.values() for name in operations}
+    assert registered <= set(CMS.OPERATION_SCHEMAS)
+    assert not set(CMS.SOAP_OPERATIONS["customerService"]) & set(CMS.SOAP_OPERATIONS["orderService"])
+
+
+def test_handlers_receive_fields_or_the_raw_body(client, recorded):
+    client.post('/orderService', data='<get_order><orderID>O1</orderID><extra>x</extra></get_order>')
+    raw = b'<create_orders_batch><order><orderID>O2</orderID></order></create_orders_batch>'
+    client.post('/orderService', data=raw)
+    assert recorded == [("get_order", {"orderID": "O1"}), ("create_orders_batch", raw)]
+
+
+def test_operation_names_inside_the_payload_do_not_route(client, recorded):
+    client.post('/orderService', data=(
+        '<get_order><orderID>O1</orderID><note><create_orders_batch/><get_customer/></note></get_order>'))
+    assert [name for name, _ in recorded] == ["get_order"]
+
+
+@pytest.mark.parametrize("path, body", [
+    ('/customerService', '<get_order><orderID>O1</orderID></get_order>'),
+    ('/orderService', '<get_customer><customer_id>C1</customer_id></get_customer>'),
+    ('/orderService', '<Envelope><Body/></Envelope>'),
+])
+def test_operations_of_another_service_are_not_found(client, path, body):
+    response = client.post(path, data=body)
+    assert (response.status_code, response.data) == (400, b'Method not found')
+
+
+@pytest.mark.parametrize("service", ["customerService", "orderService"])
+def test_wsdl_lists_the_registered_operations(client, service):
+    wsdl = client.get(f'/{service}?wsdl').get_data(as_text=True)
+    assert f'<soap:address location="http://localhost/{service}"/>' in wsdl
+    port_operations = re.findall(r'<operation name="(\w+)">\s*<documentation>', wsdl)
+    assert port_operations == list(CMS.SOAP_OPERATIONS[service])
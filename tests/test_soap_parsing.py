@@ -0,0 +1,99 @@
+"""parse_soap_request: routing on the first child of soap:Body and one-pass field extraction."""
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import CMS
+
+SOAP = 'xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"'
+
+
+def test_header_before_the_body_is_not_taken_for_the_operation():
+    operation, fields = CMS.parse_soap_request(
+        f'<soap:Envelope {SOAP}><soap:Header><get_order><orderID>spoofed</orderID></get_order></soap:Header>'
+        '<soap:Body><get_customer><customer_id>C1</customer_id></get_customer></soap:Body></soap:Envelope>'
+    )
+    assert (operation, fields) == ("get_customer", {"customer_id": "C1"})
+
+
+@pytest.mark.parametrize("document", [
+    f'<soap:Envelope {SOAP}><soap:Body><get_order><orderID>O1</orderID></get_order></soap:Body></soap:Envelope>',
+    '<Envelope xmlns="http://schemas.xmlsoap.org/soap/envelope/"><Body>'
+    '<get_order xmlns="urn:cms"><orderID>O1</orderID></get_order></Body></Envelope>',
+    '<Envelope><Body><get_order><orderID>O1</orderID></get_order></Body></Envelope>',
+    '<s:Envelope xmlns:s="http://www.w3.org/2003/05/soap-envelope"><s:Body>'
+    '<c:get_order xmlns:c="urn:cms"><c:orderID>O1</c:orderID></c:get_order></s:Body></s:Envelope>',
+    '<get_order><orderID>O1</orderID></get_order>',
+])
+def test_prefixed_default_namespaced_and_bare_documents(document):
+    assert CMS.parse_soap_request(document) == ("get_order", {"orderID": "O1"})
+
+
+def test_first_occurrence_of_a_field_wins_at_any_depth():
+    operation, fields = CMS.parse_soap_request(
+        '<get_customer_orders><filter><status>shipped</status></filter><status>pending</status>'
+        '<customer_id>C1</customer_id></get_customer_orders>'
+    )
+    assert fields["status"] == "shipped"
+    assert (fields["customer_id"], fields["limit"]) == ("C1", None)
+
+
+def test_repeated_elements_keep_only_their_own_children():
+    operation, fields = CMS.parse_soap_request(
+        '<create_order><orderID>O1</orderID><items>'
+        '<item><product_id>P1</product_id><name>Tea</name><box><name>Carton</name></box></item>'
+        '<item><name>Cake</name><quantity>2</quantity></item>'
+        '</items><notes><item><name>Not an order item</name></item></notes></create_order>'
+    )
+    assert operation == "create_order"
+    assert fields["orderID"] == "O1"
+    assert [(item["product_id"], item["name"], item["quantity"]) for item in fields["items"]] == [
+        ("P1", "Tea", None), (None, "Cake", "2")]
+    # An item's own <name> is not mistaken for an operation field
+    assert "name" not in fields
+
+
+def test_batch_entries_in_a_wrapper_or_directly_in_the_body():
+    wrapped = CMS.parse_soap_operation(
+        '<update_order_status_batch><update_order_status><orderID>O1</orderID><status>a</status>'
+        '</update_order_status></update_order_status_batch>',
+        None, CMS.OPERATION_SCHEMAS['update_order_status_batch'])
+    bare = CMS.parse_soap_operation(
+        f'<soap:Envelope {SOAP}><soap:Body><update_order_status><orderID>O2</orderID><status>b</status>'
+        '</update_order_status></soap:Body></soap:Envelope>',
+        None, CMS.OPERATION_SCHEMAS['update_order_status_batch'])
+    assert wrapped['update_order_status_batch'] == [{"orderID": "O1", "status": "a"}]
+    assert bare['Body'] == [{"orderID": "O2", "status": "b"}]
+
+
+def test_unknown_operation_is_found_but_has_no_fields():
+    assert CMS.parse_soap_request(f'<soap:Envelope {SOAP}><soap:Body><drop_tables/></soap:Body></soap:Envelope>') == (
+        "drop_tables", {})
+
+
+def test_empty_body_has_no_operation():
+    assert CMS.parse_soap_request(f'<soap:Envelope {SOAP}><soap:Body/></soap:Envelope>') == (None, None)
+
+
+def test_parsing_stops_once_the_operation_closes():
+    # Whatever follows the operation element is never read, even if it is not well formed
+    assert CMS.parse_soap_request('<get_order><orderID>O1</orderID></get_order><<<') == ("get_order", {"orderID": "O1"})
+
+
+@pytest.mark.parametrize("document", [
+    '<get_order><orderID>O1</get_order>',
+    f'<soap:Envelope {SOAP}><soap:Body><get_order><orderID>O1',
+    'not xml at all',
+])
+def test_malformed_xml_raises_parse_error(document):
+    with pytest.raises(ET.ParseError):
+        CMS.parse_soap_request(document)
+
+
+def test_services_answer_unknown_operations_and_malformed_xml(client):
+    unknown = client.post('/orderService', data=f'<soap:Envelope {SOAP}><soap:Body><drop_tables/></soap:Body></soap:Envelope>')
+    assert (unknown.status_code, unknown.data) == (400, b'Method not found')
+
+    malformed = client.post('/orderService', data='<get_order><orderID>O1</get_order>')
+    assert malformed.status_code == 500
+    assert b'<soap_error><status>Error</status><message>Internal server error: ' in malformed.data
@@ -0,0 +1,91 @@
+"""Lazy startup: importing CMS has no side effects, and district data is served from its binary cache."""
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import CMS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, **environ):
+    return subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True,
+                          env=dict(os.environ, **environ))
+
+
+def test_import_reads_no_config_and_connects_nothing():
+    # An invalid setting only fails the process that actually starts the app
+    imported = run_python("import CMS; print(CMS.SERVER_CONFIG, CMS.client, CMS.DISTRICT_COORDINATES)",
+                          CMS_MAX_POOL_SIZE="many")
+    assert imported.returncode == 0, imported.stderr
+    assert imported.stdout.split() == ["None", "None", "{}"]
+
+    started = run_python("import CMS; CMS.create_app(connect=False)", CMS_MAX_POOL_SIZE="many")
+    assert started.returncode != 0
+    assert "Invalid value for max_pool_size: 'many'" in started.stderr
+
+
+def test_server_config_precedence(tmp_path):
+    config_path = tmp_path / "server.json"
+    config_path.write_text('{"workers": 4, "threads": 2}')
+    config = CMS.load_server_config(str(config_path), environ={"CMS_THREADS": "16"})
+    assert (config["workers"], config["threads"], config["timeout"]) == (4, 16, 30)
+
+    config_path.write_text('{"worker": 4}')
+    with pytest.raises(ValueError, match="Unknown config keys: worker"):
+        CMS.load_server_config(str(config_path), environ={})
+
+
+def test_mongodb_uri_has_no_default(tmp_path):
+    assert CMS.load_server_config(environ={})["mongodb_uri"] == ""
+    assert CMS.load_server_config(environ={"MONGODB_URI": "mongodb://a"})["mongodb_uri"] == "mongodb://a"
+    config = CMS.load_server_config(environ={"MONGODB_URI": "mongodb://a", "CMS_MONGODB_URI": "mongodb://b"})
+    assert config["mongodb_uri"] == "mongodb://b"
+    with pytest.raises(ValueError, match="No MongoDB URI configured"):
+        CMS.require_mongodb_uri(CMS.load_server_config(environ={"MONGODB_URI": " "}))
+
+
+@pytest.mark.parametrize("command", [
+    "import CMS_server, sys; sys.exit(CMS_server.main([]))",
+    "import runpy; runpy.run_path('CMS.py', run_name='__main__')",
+])
+def test_servers_refuse_to_start_without_a_mongodb_uri(command):
+    environ = {key: value for key, value in os.environ.items()
+               if key not in ("MONGODB_URI", "CMS_MONGODB_URI", "CMS_CONFIG")}
+    refused = subprocess.run([sys.executable, "-c", command], cwd=REPO_ROOT, capture_output=True, text=True,
+                             env=environ, timeout=60)
+    assert refused.returncode == 1
+    assert "Invalid server configuration: No MongoDB URI configured" in refused.stdout
+
+
+@pytest.fixture
+def district_files(tmp_path):
+    xml_path = tmp_path / "districts.xml"
+    shutil.copy(CMS.DISTRICT_XML_PATH, xml_path)
+    yield str(xml_path), str(tmp_path / "districts.cache")
+    CMS.load_district_coordinates()
+
+
+def test_district_cache_skips_xml_parsing_until_the_xml_changes(district_files, monkeypatch):
+    xml_path, cache_path = district_files
+    CMS.load_district_coordinates(xml_path, cache_path)
+    assert os.path.exists(cache_path)
+    districts = CMS.DISTRICT_COORDINATES
+
+    parsed = []
+    parse = CMS.parse_district_coordinates
+    monkeypatch.setattr(CMS, "parse_district_coordinates", lambda path: parsed.append(path) or parse(path))
+    CMS.load_district_coordinates(xml_path, cache_path)
+    assert parsed == []
+    assert CMS.DISTRICT_COORDINATES == districts
+
+    with open(xml_path, encoding="utf-8") as xml_file:
+        xml = xml_file.read()
+    with open(xml_path, "w", encoding="utf-8") as xml_file:
+        xml_file.write(xml.replace("<alias>ngb</alias>", "<alias>ngb</alias><alias>neg</alias>"))
+    CMS.load_district_coordinates(xml_path, cache_path)
+    assert parsed == [xml_path]
+    assert "neg" in CMS.DISTRICT_COORDINATES["Negombo"]["aliases"]
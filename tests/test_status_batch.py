@@ -0,0 +1,86 @@
+"""/api/updateStatusBatch: per-entry results, and events and counters that follow the write."""
+import re
+
+import pytest
+
+import CMS
+
+
+@pytest.fixture
+def orders(create_customer, create_order):
+    create_customer("C1")
+    for order_id in ("O1", "O2", "O3"):
+        create_order(order_id, "C1")
+
+
+def update_batch(client, *entries):
+    body = ''.join(f'<update_order_status><orderID>{order_id}</orderID><status>{status}</status></update_order_status>'
+                   for order_id, status in entries)
+    response = client.post('/api/updateStatusBatch', data=f'<update_order_status_batch>{body}</update_order_status_batch>')
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    results = re.findall(r'<orderID>([^<]*)</orderID><new_status>([^<]*)</new_status><result>(\w+)</result>', text)
+    return results, text
+
+
+def statuses(database):
+    return {order["orderID"]: order["status"] for order in database[CMS.ORDERS_COLLECTION_NAME].find()}
+
+
+def status_events(database):
+    return [(event["orderID"], event["previous_status"], event["status"])
+            for event in database[CMS.ORDER_EVENTS_COLLECTION_NAME].find({"type": "status_changed"}).sort("seq", 1)]
+
+
+def test_each_entry_reports_its_result(client, database, orders):
+    client.post('/api/updateStatus', data='<update_order_status><orderID>O2</orderID><status>shipped</status></update_order_status>')
+    results, text = update_batch(client, ("O1", "shipped"), ("O2", "shipped"), ("O9", "shipped"))
+    assert results == [("O1", "shipped", "modified"), ("O2", "shipped", "matched"), ("O9", "shipped", "not_found")]
+    assert '<modified>1</modified><matched>1</matched><not_found>1</not_found><conflicts>0</conflicts>' in text
+    assert statuses(database) == {"O1": "shipped", "O2": "shipped", "O3": "pending"}
+
+
+def test_later_entry_for_the_same_order_supersedes_the_earlier_one(client, database, orders):
+    results, text = update_batch(client, ("O1", "shipped"), ("O1", "delivered"), ("O1", "returned"))
+    assert [result for _, _, result in results] == ["error", "error", "modified"]
+    assert text.count('Superseded by a later entry for the same order') == 2
+    assert statuses(database)["O1"] == "returned"
+    assert status_events(database) == [("O1", "pending", "returned")]
+
+
+def test_no_op_entries_leave_the_order_untouched(client, database, orders):
+    before = database[CMS.ORDERS_COLLECTION_NAME].find_one({"orderID": "O3"})
+    results, _ = update_batch(client, ("O3", "pending"), ("", "shipped"), ("O3", " "))
+    # An invalid entry is reported on its own and supersedes nothing
+    assert results == [("O3", "pending", "matched"), ("", "shipped", "error"), ("O3", "", "error")]
+    assert database[CMS.ORDERS_COLLECTION_NAME].find_one({"orderID": "O3"}) == before
+    assert status_events(database) == []
+
+
+class RacingCollection:
+    """An orders collection where another writer updates orders between the batch's read and its write"""
+
+    def __init__(self, collection, updates):
+        self._collection = collection
+        self._updates = updates
+
+    def bulk_write(self, operations, **kwargs):
+        for order_id, status in self._updates:
+            self._collection.update_one({"orderID": order_id}, {"$set": {"status": status}})
+        return self._collection.bulk_write(operations, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+def test_orders_changed_between_read_and_write_are_conflicts(client, database, orders, monkeypatch):
+    monkeypatch.setattr(CMS, "orders_collection", RacingCollection(CMS.orders_collection, [("O2", "cancelled")]))
+    results, text = update_batch(client, ("O1", "shipped"), ("O2", "shipped"))
+    assert results == [("O1", "shipped", "modified"), ("O2", "shipped", "conflict")]
+    assert '<conflicts>1</conflicts>' in text
+
+    # The concurrent status stands, and nothing is counted for the entry that was not applied
+    assert statuses(database) == {"O1": "shipped", "O2": "cancelled", "O3": "pending"}
+    assert status_events(database) == [("O1", "pending", "shipped")]
+    counts = database[CMS.ORDER_COUNTERS_COLLECTION_NAME].find_one({"_id": "customer:C1"})["status"]
+    assert {status: count for status, count in counts.items() if count} == {"pending": 2, "shipped": 1}
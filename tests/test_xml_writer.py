@@ -0,0 +1,90 @@
+"""XMLWriter, render_order and the chunked order stream."""
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import CMS
+
+ORDER = {
+    "_id": ObjectId("65f000000000000000000001"), "orderID": "O<1>", "customer_id": "C&1", "totalAmount": 12.5,
+    "created_at": datetime(2024, 3, 1, 9, 30, 15, 250000),
+    "items": [{"product_id": "P1", "name": "Fish & Chips", "quantity": 2, "price": 3.75}, {"name": "Tea"}],
+}
+
+
+@pytest.mark.parametrize("value, text", [
+    ("plain", "plain"),
+    ("a < b & c > d", "a &lt; b &amp; c &gt; d"),
+    (None, ""),
+    (True, "true"),
+    (3, "3"),
+    (0.5, "0.5"),
+    (datetime(2024, 1, 2, 3, 4, 5), "2024-01-02T03:04:05"),
+    (ObjectId("65f000000000000000000001"), "65f000000000000000000001"),
+])
+def test_xml_text(value, text):
+    assert CMS.xml_text(value) == text
+
+
+def test_render_order_writes_fields_in_order_with_defaults():
+    writer = CMS.XMLWriter()
+    CMS.render_order(writer, ORDER, ('orderID', 'status', 'totalAmount', 'priority', 'items'))
+    assert writer.getvalue() == (
+        '<order><orderID>O&lt;1&gt;</orderID><status>pending</status><totalAmount>12.5</totalAmount><priority></priority>'
+        '<items><item><product_id>P1</product_id><name>Fish &amp; Chips</name><quantity>2</quantity><price>3.75</price>'
+        '<image></image></item><item><product_id></product_id><name>Tea</name><quantity>0</quantity><price>0</price>'
+        '<image></image></item></items></order>'
+    )
+
+
+def test_every_listing_shape_is_well_formed():
+    for fields in (CMS.ORDER_SUMMARY_FIELDS, CMS.ORDER_DETAIL_FIELDS, CMS.ORDER_EXPORT_FIELDS):
+        writer = CMS.XMLWriter()
+        CMS.render_order(writer, ORDER, fields)
+        order = ET.fromstring(writer.getvalue())
+        assert [child.tag for child in order] == list(fields)
+        assert order.findtext('orderID') == "O<1>"
+        assert [item.findtext('name') for item in order.find('items')] == ["Fish & Chips", "Tea"]
+
+
+class Cursor:
+    def __init__(self, documents, fail_after=None):
+        self.documents = documents
+        self.fail_after = fail_after
+        self.closed = False
+
+    def __iter__(self):
+        for count, document in enumerate(self.documents):
+            if count == self.fail_after:
+                raise RuntimeError("cursor lost")
+            yield document
+
+    def close(self):
+        self.closed = True
+
+
+def listing_query(limit=None):
+    query, _ = CMS.build_order_listing_query("C1", CMS.ORDER_SUMMARY_FIELDS, limit=limit)
+    return query
+
+
+def test_stream_yields_one_chunk_per_order_and_closes_the_cursor():
+    orders = [dict(ORDER, orderID=f"O{i}") for i in range(3)]
+    cursor = Cursor(orders)
+    chunks = list(CMS.stream_orders_response('get_orders_response', CMS.orders_listing_header("C1", 3), cursor, listing_query(3)))
+    assert len(chunks) == 5 and all(chunk.startswith('<order>') for chunk in chunks[1:4])
+    assert cursor.closed
+
+    body = ET.fromstring(''.join(chunks)).find('.//get_orders_response')
+    assert [order.findtext('orderID') for order in body.find('orders')] == ["O0", "O1", "O2"]
+    assert body.findtext('orders_count') == "3"
+    assert CMS.decode_order_cursor(body.findtext('next_cursor')) == (orders[2]["created_at"], orders[2]["_id"])
+
+
+def test_stream_ends_early_when_the_cursor_fails():
+    cursor = Cursor([ORDER, ORDER], fail_after=1)
+    chunks = list(CMS.stream_orders_response('get_orders_response', CMS.orders_listing_header("C1", 2), cursor, listing_query()))
+    assert len(chunks) == 2 and not chunks[-1].endswith('</soap:Envelope>')
+    assert cursor.closed